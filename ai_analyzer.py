@@ -1,87 +1,510 @@
+import time  # Importa a biblioteca time para medir o tempo de inicialização
 import pandas as pd  # Importa a biblioteca pandas para manipulação de dados
+import numpy as np  # Importa a biblioteca numpy para operações vetorizadas
 import json  # Importa a biblioteca json para carregar e salvar dados em formato JSON
 import re  # Importa a biblioteca de expressões regulares para limpeza de texto
+import os  # Importa a biblioteca os para manipular caminhos de arquivos
+import hashlib  # Importa a biblioteca hashlib para calcular o hash do arquivo de treino
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+from datetime import datetime  # Importa datetime para registrar quando cada modelo foi salvo
+import joblib  # Importa a biblioteca joblib para salvar e carregar o modelo treinado
+import sklearn  # Importa o sklearn para registrar a versão usada no modelo salvo
+import dedup  # Importa o índice de notícias quase duplicadas (MinHash/LSH)
+import instrumentation  # Importa os temporizadores e contadores de desempenho
+import storage  # Importa o armazenamento de notícias em Parquet / JSON Lines
 from sklearn.feature_extraction.text import TfidfVectorizer  # Importa o vetorizador TF-IDF para conversão de texto em vetor
+from sklearn.feature_extraction.text import HashingVectorizer  # Importa o vetorizador por hashing, que não guarda vocabulário
+from sklearn.linear_model import SGDClassifier  # Importa classificador linear com treino incremental (partial_fit)
 from sklearn.decomposition import TruncatedSVD  # Importa SVD truncado para redução de dimensionalidade
 from sklearn.discriminant_analysis import LinearDiscriminantAnalysis  # Importa LDA para análise discriminante linear
 from sklearn.model_selection import train_test_split  # Importa função para dividir dados em treino e teste
 from sklearn.pipeline import make_pipeline  # Importa função para criar pipelines de processamento
 from sklearn.metrics import accuracy_score  # Importa função para calcular a acurácia da predição
 
-# Função para carregar dataset a partir de um arquivo JSON
-def load_dataset(filename):
-    with open(filename, 'r', encoding='utf-8') as file:  # Abre o arquivo JSON
-        data = json.load(file)  # Carrega os dados do arquivo JSON
+# Função para obter há quantos segundos o processo foi criado, a partir do /proc do Linux: a medida inclui a
+# inicialização do interpretador e todas as importações, não importa qual módulo foi importado primeiro
+# Sem /proc, retorna 0 e o cold start passa a contar a partir da importação deste módulo
+def process_age():
+    try:
+        with open('/proc/self/stat', 'r') as file:
+            start_ticks = int(file.read().rsplit(')', 1)[1].split()[19])  # Campo starttime, em ticks desde o boot
+        with open('/proc/uptime', 'r') as file:
+            uptime = float(file.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 0.0)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+PROCESS_START = time.perf_counter() - process_age()  # Criação do processo, no relógio de time.perf_counter
+
+# Diretório onde os modelos treinados são salvos
+MODEL_DIR = 'models'
+MODEL_REGISTRY = os.path.join(MODEL_DIR, 'registry.json')  # Índice dos modelos salvos
+COLD_START_LOG = os.path.join(MODEL_DIR, 'cold_start.jsonl')  # Histórico do tempo até a primeira previsão
+STREAMING_MODEL_PATH = os.path.join(MODEL_DIR, 'streaming_classifier.joblib')  # Modelo do treino incremental
+
+# Hiperparâmetros do pipeline; qualquer mudança aqui gera um novo modelo
+HYPERPARAMS = {
+    'max_features': 1000,
+    'ngram_range': (1, 2),
+    'n_components': 100,
+    'solver': 'lsqr',
+    'shrinkage': 'auto',
+    'test_size': 0.2,
+    'random_state': 42,
+}
+
+# Versão do pré-processamento (clean_text) e do pipeline (build_pipeline); entra na identidade do modelo salvo
+# Deve ser incrementada a cada mudança nessas funções, para que um modelo treinado com o código antigo não seja
+# carregado e aplicado a textos limpos do jeito novo. 2: clean_text remove letras acentuadas isoladas;
+# 3: o TruncatedSVD recebe random_state
+PIPELINE_VERSION = 3
+
+# Hiperparâmetros do treino incremental (HashingVectorizer + SGDClassifier)
+STREAMING_PARAMS = {
+    'n_features': 2 ** 18,
+    'ngram_range': (1, 2),
+    'alpha': 1e-4,
+    'chunk_size': 10_000,
+    'epochs': 5,
+    'random_state': 42,
+}
+STREAMING_CLASSES = np.array([0, 1, 2])  # Todas as classes precisam ser conhecidas desde o primeiro partial_fit
+
+# Função para carregar dataset a partir de um arquivo JSON ou do armazenamento de notícias (Parquet/JSON Lines)
+# columns limita as colunas lidas do armazenamento
+def load_dataset(filename, columns=None):
+    if storage.is_store(filename):
+        df = storage.read_frame(filename, columns)  # Lê só as colunas pedidas, direto para um DataFrame
+    else:
+        with open(filename, 'r', encoding='utf-8') as file:  # Abre o arquivo JSON
+            data = json.load(file)  # Carrega os dados do arquivo JSON
         df = pd.DataFrame(data)  # Converte os dados para um DataFrame do pandas
-        if 'label' in df:  # Verifica se a coluna 'label' existe
-            # Converte os labels para valores numéricos: 'good' -> 0, 'bad' -> 1, outros -> 2
-            df['label'] = df['label'].apply(lambda x: 0 if x == 'good' else 1 if x == 'bad' else 2)
-        return df  # Retorna o DataFrame
+    if 'label' in df:  # Verifica se a coluna 'label' existe
+        # Converte os labels para valores numéricos: 'good' -> 0, 'bad' -> 1, outros -> 2
+        df['label'] = df['label'].apply(lambda x: 0 if x == 'good' else 1 if x == 'bad' else 2)
+    return df  # Retorna o DataFrame
+
+# Expressões da limpeza de texto, compiladas uma única vez
+# Trocar cada sequência de caracteres não alfanuméricos por um espaço já remove os espaços extras
+NON_WORD_RE = re.compile(r'\W+')
+# Palavras isoladas de uma letra, incluindo letras acentuadas ("à", "é")
+SINGLE_LETTER_RE = re.compile(r'\s+[^\W\d_]\s+')
+# Separador usado para limpar uma coluna inteira como um único texto (caractere de uso privado)
+DOCUMENT_SEPARATOR = '\ue000'
+NON_WORD_KEEP_SEPARATOR_RE = re.compile(r'[^\w' + DOCUMENT_SEPARATOR + r']+')
 
 # Função para limpar o texto
 def clean_text(text):
-    text = re.sub(r'\W', ' ', str(text))  # Remove caracteres não alfanuméricos
+    text = NON_WORD_RE.sub(' ', str(text))  # Remove caracteres não alfanuméricos e espaços extras
     text = text.lower()  # Converte o texto para minúsculas
-    text = re.sub(r'\s+[a-zA-Z]\s+', ' ', text)  # Remove palavras isoladas de uma letra
-    text = re.sub(r'\s+', ' ', text, flags=re.I)  # Remove espaços extras
+    text = SINGLE_LETTER_RE.sub(' ', text)  # Remove palavras isoladas de uma letra
     return text  # Retorna o texto limpo
 
+# Cache de textos limpos, indexado pelo hash do texto original
+class TextCache:
+    def __init__(self, max_size=1_000_000):
+        self.max_size = max_size
+        self.entries = {}
+
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def lookup(self, keys):
+        return [self.entries.get(key) for key in keys]
+
+    def store(self, keys, cleaned):
+        if len(self.entries) + len(keys) > self.max_size:
+            self.entries.clear()  # Evita que o cache cresça sem limite
+        self.entries.update(zip(keys, cleaned))
+
+# Cache compartilhado entre o treino e a previsão dentro do mesmo processo
+TEXT_CACHE = TextCache()
+
+# Função para limpar uma coluna inteira de textos em uma única passada de cada expressão
+def clean_text_series(texts, cache=None):
+    texts = pd.Series(texts, dtype=object).map(str)  # Converte como str(), inclusive valores ausentes
+    if cache is not None:
+        keys = [cache.key(text) for text in texts]
+        cleaned = pd.Series(cache.lookup(keys), index=texts.index, dtype=object)
+        missing = cleaned.isna().to_numpy()
+        if missing.any():
+            fresh = clean_text_series(texts[missing])
+            cleaned[missing] = fresh
+            cache.store([key for key, is_missing in zip(keys, missing) if is_missing], fresh.tolist())
+        return cleaned
+    joined = DOCUMENT_SEPARATOR.join(texts.tolist())
+    if joined.count(DOCUMENT_SEPARATOR) != max(len(texts) - 1, 0):
+        return texts.apply(clean_text)  # O separador aparece em algum texto: limpa um por um
+    # As mesmas etapas de clean_text, aplicadas a todos os textos de uma vez
+    joined = NON_WORD_KEEP_SEPARATOR_RE.sub(' ', joined).lower()
+    joined = SINGLE_LETTER_RE.sub(' ', joined)
+    return pd.Series(joined.split(DOCUMENT_SEPARATOR) if len(texts) else [], index=texts.index, dtype=object)
+
+# Função para criar o pipeline TF-IDF -> SVD -> LDA com os hiperparâmetros informados
+def build_pipeline(params=HYPERPARAMS, memory=None):
+    tfidf_vectorizer = TfidfVectorizer(max_features=params['max_features'], ngram_range=tuple(params['ngram_range']))  # Cria um vetorizador TF-IDF
+    # Cria um transformador SVD truncado; a semente fixa torna o treino reproduzível
+    svd = TruncatedSVD(n_components=params['n_components'], random_state=params['random_state'])
+    lda = LinearDiscriminantAnalysis(solver=params['solver'], shrinkage=params['shrinkage'])  # Cria um classificador LDA
+    # Cria um pipeline com as etapas acima; com memory, os transformadores ajustados ficam em cache no disco
+    return make_pipeline(tfidf_vectorizer, svd, lda, memory=memory)
+
 # Função para treinar e avaliar o modelo
-def train_and_evaluate(dataset_path):
+def train_and_evaluate(dataset_path, params=HYPERPARAMS):
     df_train = load_dataset(dataset_path)  # Carrega o dataset de treino
     # Cria uma nova coluna 'text' combinando 'title' e 'introducao'
     df_train['text'] = df_train['title'] + " " + df_train.get('introducao', '')
-    df_train['text'] = df_train['text'].apply(clean_text)  # Aplica limpeza no texto
+    df_train['text'] = clean_text_series(df_train['text'], cache=TEXT_CACHE)  # Aplica limpeza no texto
     if len(df_train['label'].unique()) < 2:  # Verifica se há pelo menos duas classes para treinamento
         print("Insufficient classes for training.")  # Imprime mensagem de erro se houver classes insuficientes
         return None  # Retorna None
     # Divide o dataset em treino e teste
-    x_train, x_test, y_train, y_test = train_test_split(df_train['text'], df_train['label'], test_size=0.2,
-                                                        random_state=42, stratify=df_train['label'])
-    tfidf_vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))  # Cria um vetorizador TF-IDF
-    svd = TruncatedSVD(n_components=100)  # Cria um transformador SVD truncado
-    lda = LinearDiscriminantAnalysis(solver='lsqr', shrinkage='auto')  # Cria um classificador LDA
-    clf = make_pipeline(tfidf_vectorizer, svd, lda)  # Cria um pipeline com as etapas acima
+    x_train, x_test, y_train, y_test = train_test_split(df_train['text'], df_train['label'], test_size=params['test_size'],
+                                                        random_state=params['random_state'], stratify=df_train['label'])
+    clf = build_pipeline(params)  # Cria o pipeline com os hiperparâmetros informados
     clf.fit(x_train, y_train)  # Treina o modelo com os dados de treino
     predictions = clf.predict(x_test)  # Realiza previsões com os dados de teste
     accuracy = accuracy_score(y_test, predictions)  # Calcula a acurácia das previsões
     print(f"Accuracy: {accuracy}")  # Imprime a acurácia
     return clf  # Retorna o modelo treinado
 
-# Função para prever novos dados e salvar os resultados
-def predict_new_data(model, analysis_data_path, result_filename, news_filename):
-    df_new = load_dataset(analysis_data_path)  # Carrega o novo dataset para análise
-    # Cria uma nova coluna 'text' combinando 'title' e 'introducao'
-    df_new['text'] = df_new['title'] + " " + df_new.get('introducao', '')
-    df_new['text'] = df_new['text'].apply(clean_text)  # Aplica limpeza no texto
-    predictions = model.predict(df_new['text'])  # Faz previsões com o modelo treinado
-    # Adiciona as previsões ao DataFrame
-    df_new['predicted_label'] = ['good' if label == 0 else 'bad' for label in predictions]
-    # Cria uma lista de dicionários com título e previsão
-    detailed_results = [{'title': row['title'], 'prediction': row['predicted_label']} for index, row in
-                        df_new.iterrows()]
-    good_count = sum(df_new['predicted_label'] == 'good')  # Conta o número de previsões 'good'
-    bad_count = sum(df_new['predicted_label'] == 'bad')  # Conta o número de previsões 'bad'
-    total = len(df_new)  # Conta o total de previsões
+# Função para criar o pipeline incremental: o vetorizador por hashing não precisa ver o corpus inteiro
+def build_streaming_model(params=STREAMING_PARAMS):
+    vectorizer = HashingVectorizer(n_features=params['n_features'], ngram_range=tuple(params['ngram_range']),
+                                   alternate_sign=False)  # Cria um vetorizador sem estado
+    sgd = SGDClassifier(loss='log_loss', alpha=params['alpha'], random_state=params['random_state'])  # Cria um classificador incremental
+    return make_pipeline(vectorizer, sgd)
+
+# Função para ler um arquivo de notícias rotuladas em blocos de chunk_size linhas
+# Arquivos JSON Lines (.jsonl) são lidos em streaming; listas JSON são carregadas e depois divididas
+def iter_labelled_chunks(dataset_path, chunk_size=STREAMING_PARAMS['chunk_size']):
+    if dataset_path.endswith('.jsonl') and not os.path.isdir(dataset_path):
+        with pd.read_json(dataset_path, lines=True, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                yield chunk
+    else:
+        data = load_dataset(dataset_path)
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+
+# Função para converter um arquivo JSON (lista) em JSON Lines, o formato lido em streaming
+def convert_to_jsonl(json_path, jsonl_path):
+    with open(json_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    with open(jsonl_path, 'w', encoding='utf-8') as file:
+        for record in data:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+# Função para atualizar o modelo incremental com um bloco de notícias rotuladas
+def partial_fit_chunk(model, chunk, random_state=None):
+    chunk = chunk.sample(frac=1, random_state=random_state)  # Embaralha o bloco: os arquivos costumam vir ordenados por rótulo
+    texts = clean_text_series(chunk['title'] + " " + chunk.get('introducao', ''), cache=TEXT_CACHE)
+    labels = chunk['label']
+    if not pd.api.types.is_integer_dtype(labels):
+        labels = labels.map({'good': 0, 'bad': 1}).fillna(2).astype(int)  # Mesma codificação de load_dataset
+    vectorizer, sgd = model[0], model[-1]
+    sgd.partial_fit(vectorizer.transform(texts), labels, classes=STREAMING_CLASSES)
+    return model
+
+# Função para treinar (ou continuar treinando) o modelo incremental lendo o arquivo em blocos
+def train_streaming(dataset_path, model=None, params=STREAMING_PARAMS, epochs=None):
+    model = model or build_streaming_model(params)
+    for epoch in range(params['epochs'] if epochs is None else epochs):
+        for chunk in iter_labelled_chunks(dataset_path, params['chunk_size']):
+            partial_fit_chunk(model, chunk, random_state=params['random_state'] + epoch)
+    return model
+
+# Função para acrescentar ao modelo incremental as notícias rotuladas do dia, sem treinar do zero
+def update_streaming_model(labelled_path, model_path=STREAMING_MODEL_PATH, params=STREAMING_PARAMS):
+    model = joblib.load(model_path) if os.path.exists(model_path) else None  # Sem mmap: os pesos serão alterados
+    model = train_streaming(labelled_path, model, params, epochs=1)
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(model, model_path)
+    print(f"Modelo incremental salvo em {model_path}")
+    return model
+
+# Função para comparar o pipeline atual e o incremental no mesmo conjunto de teste
+def compare_with_streaming(dataset_path, params=HYPERPARAMS, streaming_params=STREAMING_PARAMS):
+    df = load_dataset(dataset_path)
+    # Mesma divisão usada em train_and_evaluate
+    df_train, df_test = train_test_split(df, test_size=params['test_size'], random_state=params['random_state'],
+                                         stratify=df['label'])
+    test_texts = clean_text_series(df_test['title'] + " " + df_test.get('introducao', ''), cache=TEXT_CACHE)
+
+    batch_model = build_pipeline(params)
+    batch_model.fit(clean_text_series(df_train['title'] + " " + df_train.get('introducao', ''), cache=TEXT_CACHE),
+                    df_train['label'])
+    batch_accuracy = accuracy_score(df_test['label'], batch_model.predict(test_texts))
+
+    streaming_model = build_streaming_model(streaming_params)
+    chunk_size = streaming_params['chunk_size']
+    for epoch in range(streaming_params['epochs']):
+        for start in range(0, len(df_train), chunk_size):
+            partial_fit_chunk(streaming_model, df_train.iloc[start:start + chunk_size],
+                              random_state=streaming_params['random_state'] + epoch)
+    streaming_accuracy = accuracy_score(df_test['label'], streaming_model.predict(test_texts))
+
+    print(f"Accuracy (TF-IDF + SVD + LDA): {batch_accuracy:.4f}")
+    print(f"Accuracy (Hashing + SGD, incremental): {streaming_accuracy:.4f}")
+    return batch_accuracy, streaming_accuracy
+
+# Função para calcular a identidade do modelo: hash do arquivo de treino, hiperparâmetros, versão do pipeline
+# e versão do sklearn
+def model_fingerprint(dataset_path, params=HYPERPARAMS):
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as file:  # Lê o arquivo de treino em blocos
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+    digest.update(f"pipeline={PIPELINE_VERSION}".encode('utf-8'))
+    digest.update(sklearn.__version__.encode('utf-8'))
+    return digest.hexdigest()
+
+# Função para carregar o índice de modelos salvos
+def load_registry(registry_path=MODEL_REGISTRY):
+    if not os.path.exists(registry_path):
+        return {}
+    with open(registry_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+# Função para obter o caminho do modelo salvo correspondente aos dados e à configuração
+def model_artifact_path(fingerprint, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'news_classifier-{fingerprint[:16]}.joblib')
+
+# Função para carregar o modelo salvo ou treinar um novo se os dados ou a configuração mudaram
+def load_or_train_model(dataset_path, params=HYPERPARAMS, model_dir=MODEL_DIR, retrain=False):
+    fingerprint = model_fingerprint(dataset_path, params)
+    model_path = model_artifact_path(fingerprint, model_dir)
+    if not retrain and os.path.exists(model_path):
+        print(f"Modelo carregado de {model_path}")
+        return joblib.load(model_path, mmap_mode='r')  # Mapeia os arrays do modelo em memória, sem copiá-los
+    model = train_and_evaluate(dataset_path, params)  # Treina o modelo com os dados de treino
+    if model is None:
+        return None
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, model_path)  # Salva sem compressão para permitir o carregamento com mmap
+    registry_path = os.path.join(model_dir, 'registry.json')
+    registry = load_registry(registry_path)
+    registry[fingerprint] = {'path': model_path, 'dataset': dataset_path, 'params': params,
+                             'pipeline_version': PIPELINE_VERSION, 'sklearn': sklearn.__version__, 'created': datetime.now().isoformat(timespec='seconds')}
+    with open(registry_path, 'w', encoding='utf-8') as file:
+        json.dump(registry, file, ensure_ascii=False, indent=4)
+    print(f"Modelo salvo em {model_path}")
+    return model
+
+# Função para registrar o tempo entre o início do processo e a primeira previsão
+# scrape_wait_s é o tempo em que o modelo já estava pronto, mas a previsão esperava a busca das notícias (main.py);
+# ele é registrado à parte e não entra em 'seconds', que mede só a inicialização e o carregamento do modelo
+def record_cold_start(log_path=COLD_START_LOG, scrape_wait_s=0.0, **details):
+    seconds = time.perf_counter() - PROCESS_START - scrape_wait_s
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'a', encoding='utf-8') as file:  # Acrescenta uma linha por execução
+        file.write(json.dumps({'timestamp': datetime.now().isoformat(timespec='seconds'),
+                               'seconds': round(seconds, 3), 'scrape_wait_s': round(scrape_wait_s, 3),
+                               **details}) + '\n')
+    print(f"Cold start: {seconds:.2f}s (mais {scrape_wait_s:.2f}s esperando a busca)")
+    return seconds
+
+# Identificação do modelo carregado por load_model cujo cold start ainda não foi registrado
+pending_cold_start = None
+
+# Função para informar quanto tempo a primeira previsão esperou pela busca depois de o modelo ficar pronto
+def exclude_scrape_wait(seconds):
+    if pending_cold_start is not None:
+        pending_cold_start['scrape_wait_s'] = seconds
+
+# Função para classificar textos brutos, limpando e prevendo cada texto distinto uma única vez
+def predict_labels(model, texts):
+    codes, unique_texts = pd.factorize(texts, use_na_sentinel=False)  # Agrupa textos idênticos (as mesmas manchetes aparecem em vários dias)
+    with instrumentation.stage('limpeza'):
+        cleaned = clean_text_series(unique_texts, cache=TEXT_CACHE)  # Aplica limpeza no texto
+    with instrumentation.stage('previsão'):
+        predictions = model.predict(cleaned)  # Faz previsões com o modelo treinado em uma única passada
+    global pending_cold_start
+    if pending_cold_start is not None:  # Primeira previsão do modelo carregado: registra o cold start
+        details, pending_cold_start = pending_cold_start, None
+        record_cold_start(**details)
+    instrumentation.count('documentos_classificados', len(codes))
+    instrumentation.count('documentos_distintos', len(unique_texts))
+    unique_labels = np.where(predictions == 0, 'good', 'bad')
+    return unique_labels[codes]  # Devolve o rótulo de cada linha original
+
+# Função para calcular as porcentagens de previsões boas e ruins
+# Com clusters, cada grupo de quase duplicadas é contado uma vez (notícias sem grupo contam uma vez cada)
+def prediction_percentages(labels, clusters=None):
+    counted = np.asarray(labels)
+    if clusters is not None:
+        clusters = pd.Series(clusters)
+        grouped = clusters.notna().to_numpy()
+        _, first = np.unique(clusters[grouped].to_numpy(dtype=np.int64), return_index=True)
+        # Uma previsão por grupo (todas as notícias do grupo têm o mesmo rótulo)
+        counted = np.concatenate([counted[grouped][first], counted[~grouped]])
+    good_count = int(np.count_nonzero(counted == 'good'))  # Conta o número de previsões 'good'
+    bad_count = int(np.count_nonzero(counted == 'bad'))  # Conta o número de previsões 'bad'
+    total = len(counted)  # Conta o total de previsões
     # Calcula as porcentagens de previsões 'good' e 'bad'
-    percentages = {"Boas": f"{good_count / total * 100:.2f}%", "Ruins": f"{bad_count / total * 100:.2f}%"}
+    return {"Boas": f"{good_count / total * 100:.2f}%", "Ruins": f"{bad_count / total * 100:.2f}%"}
+
+# Função para salvar as previsões de um arquivo: porcentagens e resultados detalhados
+# Com clusters, cada notícia recebe o grupo de quase duplicadas e as porcentagens contam cada grupo uma vez
+# Quando news_filename não tem extensão, ele é um armazenamento particionado (storage.py): as previsões são
+# acrescentadas ao histórico e as porcentagens são calculadas sobre o histórico inteiro, lendo só as colunas
+# 'prediction' e 'cluster'
+def save_predictions(df_new, labels, result_filename, news_filename, clusters=None):
+    # Cria uma tabela com título e previsão
+    detailed_results = pd.DataFrame({'title': df_new['title'].to_numpy(), 'prediction': labels})
+    is_history = not os.path.splitext(news_filename)[1]
+    # Mantém a origem de cada notícia: o resultado do grupo vale para todas as fontes (e, no histórico, a origem
+    # define a partição); execuções com e sem agrupamento dividem o mesmo histórico, por isso ele sempre tem 'cluster'
+    if clusters is not None or is_history:
+        if 'source' in df_new:
+            detailed_results['source'] = df_new['source'].to_numpy()
+        detailed_results['cluster'] = clusters
+    if is_history:
+        storage.append_records(detailed_results.to_dict('records'), news_filename)
+        history = storage.read_frame(news_filename, columns=['prediction', 'cluster'])
+        percentages = prediction_percentages(history['prediction'].to_numpy(), history['cluster'])
+    else:
+        percentages = prediction_percentages(labels, clusters)
+        # Salva os resultados detalhados em Parquet / JSON Lines (ou em JSON, conforme a extensão do arquivo)
+        storage.write_frame(detailed_results, news_filename)
     # Salva as porcentagens em um arquivo JSON
     with open(result_filename, 'w', encoding='utf-8') as file:
         json.dump(percentages, file, ensure_ascii=False, indent=4)
-    # Salva os resultados detalhados em um arquivo JSON
-    with open(news_filename, 'w', encoding='utf-8') as file:
-        json.dump(detailed_results, file, ensure_ascii=False, indent=4)
+
+# Função para obter o DataFrame de uma entrada: caminho de arquivo JSON ou lista de notícias já em memória
+def load_frame(source):
+    if isinstance(source, str):
+        return load_dataset(source)
+    return pd.DataFrame(source)
+
+# Função para prever vários arquivos em uma única passada pelo modelo
+# jobs é uma lista de tuplas (entrada, arquivo de porcentagens, arquivo de notícias ou histórico de previsões);
+# a entrada pode ser o caminho de um arquivo JSON, a lista de notícias já carregada ou um DataFrame
+# Com dedup_index, notícias quase duplicadas (a mesma história em vários sites) são classificadas uma única vez
+def predict_batch(model, jobs, dedup_index=None):
+    frames = [load_frame(source) for source, _, _ in jobs]  # Carrega todas as entradas
+    # Cria o texto de cada notícia combinando 'title' e 'introducao'
+    texts = pd.concat([df['title'] + " " + df.get('introducao', '') for df in frames], ignore_index=True)
+    clusters = None
+    if dedup_index is not None:
+        with instrumentation.stage('agrupamento'):
+            records = [record for df in frames for record in df.to_dict('records')]
+            clusters = np.array(dedup_index.assign(records, texts.tolist()), dtype=np.int64)
+            representatives = dedup_index.representative_texts(clusters.tolist())
+        # Cada notícia passa a usar o texto do seu grupo, e predict_labels classifica cada texto distinto uma vez
+        texts = pd.Series([representatives[cluster] for cluster in clusters.tolist()], dtype=object)
+        instrumentation.count('duplicatas_agrupadas', len(clusters) - len(representatives))
+    labels = predict_labels(model, texts)
+    # Distribui os rótulos de volta para cada arquivo, na mesma ordem em que foram concatenados
+    offsets = np.cumsum([0] + [len(df) for df in frames])
+    for df_new, start, end, (_, result_filename, news_filename) in zip(frames, offsets, offsets[1:], jobs):
+        save_predictions(df_new, labels[start:end], result_filename, news_filename,
+                         clusters[start:end] if clusters is not None else None)
+
+# Função para prever novos dados e salvar os resultados
+def predict_new_data(model, analysis_data_path, result_filename, news_filename):
+    predict_batch(model, [(analysis_data_path, result_filename, news_filename)])
 
 # Caminho do arquivo de dados de treino
 train_data_file_path = 'json/news_data_train.json'
-trained_model = train_and_evaluate(train_data_file_path)  # Treina o modelo com os dados de treino
-if trained_model:  # Verifica se o modelo foi treinado com sucesso
-    for i in range(1, 6):  # Itera de 1 a 5
-        file_name = f'json/dia{i}.json'  # Gera o nome do arquivo de entrada
-        result_file_name = f'json/dia{i}result.json'  # Gera o nome do arquivo de saída de resultados
-        news_file_name = f'json/dia{i}news.json'  # Gera o nome do arquivo de saída de notícias
-        # Realiza previsões para os novos dados e salva os resultados
-        predict_new_data(trained_model, file_name, result_file_name, news_file_name)
-
-    # Realiza previsões para o arquivo news_data.json e salva os resultados
-    predict_new_data(trained_model, 'json/news_data.json', 'json/results.json', 'json/results_prediction.json')
+
+# Função para carregar o modelo usado na classificação
+# Retorna o modelo (ou None), sua identificação e de onde ele veio ('cache', 'treino' ou 'streaming')
+# O cold start do modelo é registrado na sua primeira previsão (predict_labels)
+def load_model(retrain=False, streaming=False):
+    global pending_cold_start
+    if streaming:
+        # Usa o modelo incremental mantido por --stream-train / --update
+        trained_model = joblib.load(STREAMING_MODEL_PATH) if os.path.exists(STREAMING_MODEL_PATH) else None
+        if trained_model is None:
+            print(f"Modelo incremental não encontrado em {STREAMING_MODEL_PATH}; use --stream-train primeiro.")
+        model_id, source = 'streaming', 'streaming'
+    else:
+        # Carrega o modelo salvo ou treina um novo com os dados de treino
+        fingerprint = model_fingerprint(train_data_file_path)
+        source = 'cache' if not retrain and os.path.exists(model_artifact_path(fingerprint)) else 'treino'
+        trained_model, model_id = load_or_train_model(train_data_file_path, retrain=retrain), fingerprint[:16]
+    if trained_model is not None:
+        pending_cold_start = {'model': model_id, 'source': source}
+    return trained_model, model_id, source
+
+# Arquivos de resultados (porcentagens, em JSON) e bases dos arquivos de notícias classificadas, que são gravados
+# no formato do armazenamento (Parquet ou JSON Lines); o JSON formatado só é gerado por export_outputs
+DAY_OUTPUTS = [(f'json/dia{i}.json', f'json/dia{i}result.json', f'json/dia{i}news') for i in range(1, 6)]
+# As notícias buscadas classificadas formam um histórico (storage.PREDICTIONS_STORE), exportado para results_prediction.json
+NEWS_OUTPUT = ('json/results.json', storage.PREDICTIONS_STORE, 'json/results_prediction.json')
+
+# Função para carregar as notícias buscadas: do armazenamento ou, antes da primeira busca, do JSON antigo
+def load_news_data():
+    if os.path.isdir(storage.NEWS_STORE) or not os.path.exists(storage.LEGACY_NEWS_JSON):
+        return load_dataset(storage.NEWS_STORE, storage.NEWS_COLUMNS)
+    return load_dataset(storage.LEGACY_NEWS_JSON)
+
+# Função para classificar os arquivos dos dias e as notícias buscadas, salvando os resultados
+# news_data é a lista das notícias novas da busca, que são classificadas e acrescentadas ao histórico de previsões;
+# sem ela, todas as notícias do armazenamento são classificadas de novo e o histórico é refeito
+# replace refaz o histórico só com news_data (usado depois de uma busca completa, que também refaz o armazenamento)
+# Com deduplicate, as notícias quase duplicadas são agrupadas no índice persistente antes da classificação
+def classify_all(model, news_data=None, deduplicate=True, replace=False):
+    jobs = [(file_name, result_file_name, storage.output_path(news_base))
+            for file_name, result_file_name, news_base in DAY_OUTPUTS]
+    # Inclui as notícias buscadas, cujas porcentagens (sobre todo o histórico) vão para results.json
+    if news_data is None:
+        news_data, replace = load_news_data(), True
+    if replace:
+        storage.remove_store(NEWS_OUTPUT[1])
+    if len(news_data):  # Sem notícias novas, o histórico e results.json continuam os mesmos
+        jobs.append((news_data, NEWS_OUTPUT[0], NEWS_OUTPUT[1]))
+
+    # Realiza previsões para todos os arquivos de uma vez e salva os resultados
+    if not deduplicate:
+        predict_batch(model, jobs)
+        return
+    with dedup.DedupIndex() as dedup_index:
+        predict_batch(model, jobs, dedup_index)
+
+# Função para exportar as notícias classificadas em JSON formatado (dia1news.json ... results_prediction.json)
+def export_outputs():
+    for news_base in [news_base for _, _, news_base in DAY_OUTPUTS]:
+        path = storage.output_path(news_base)
+        if os.path.exists(path):
+            storage.write_frame(storage.read_frame(path), news_base + '.json')
+            print(f"{path} exportado para {news_base}.json")
+    if os.path.isdir(NEWS_OUTPUT[1]):
+        storage.export_json(NEWS_OUTPUT[1], NEWS_OUTPUT[2])
+        print(f"{NEWS_OUTPUT[1]} exportado para {NEWS_OUTPUT[2]}")
+
+def main(retrain=False, streaming=False, deduplicate=True):
+    trained_model, model_id, source = load_model(retrain=retrain, streaming=streaming)
+    if trained_model:  # Verifica se o modelo foi treinado com sucesso
+        classify_all(trained_model, deduplicate=deduplicate)  # O cold start é registrado na primeira previsão
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classifica as notícias como boas ou ruins.")
+    parser.add_argument('--retrain', action='store_true', help="treina o modelo mesmo que exista um salvo")
+    parser.add_argument('--streaming', action='store_true', help="classifica com o modelo incremental salvo")
+    parser.add_argument('--no-dedup', action='store_true',
+                        help="classifica cada notícia separadamente, sem agrupar as quase duplicadas")
+    parser.add_argument('--stream-train', metavar='ARQUIVO',
+                        help="treina do zero o modelo incremental lendo o arquivo (.jsonl ou .json) em blocos")
+    parser.add_argument('--update', metavar='ARQUIVO',
+                        help="atualiza o modelo incremental com as notícias rotuladas do arquivo")
+    parser.add_argument('--compare', action='store_true',
+                        help="compara a acurácia do pipeline atual e do incremental no mesmo conjunto de teste")
+    parser.add_argument('--export-json', action='store_true',
+                        help="exporta as notícias classificadas em JSON (dia1news.json ... results_prediction.json)")
+    args = parser.parse_args()
+    if args.export_json:
+        export_outputs()
+    elif args.compare:
+        compare_with_streaming(train_data_file_path)
+    elif args.stream_train:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        joblib.dump(train_streaming(args.stream_train), STREAMING_MODEL_PATH)
+        print(f"Modelo incremental salvo em {STREAMING_MODEL_PATH}")
+    elif args.update:
+        update_streaming_model(args.update)
+    else:
+        main(retrain=args.retrain, streaming=args.streaming, deduplicate=not args.no_dedup)
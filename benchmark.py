@@ -0,0 +1,466 @@
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+import contextlib  # Importa a biblioteca contextlib para silenciar a saída durante as medições
+import hashlib  # Importa a biblioteca hashlib para identificar as fixtures usadas na linha de base
+import io  # Importa a biblioteca io para descartar a saída das funções medidas
+import json  # Importa a biblioteca json para ler e gravar a linha de base
+import random  # Importa a biblioteca random para gerar corpora sintéticos
+import re  # Importa a biblioteca de expressões regulares para a limpeza de texto original
+import os  # Importa a biblioteca os para manipular caminhos de arquivos
+import subprocess  # Importa a biblioteca subprocess para medir a memória em um processo separado
+import sys  # Importa a biblioteca sys para sinalizar regressões pelo código de saída
+import tempfile  # Importa a biblioteca tempfile para os arquivos gerados pelas previsões
+import time  # Importa a biblioteca time para medir o tempo de execução
+from concurrent.futures import Future  # Importa Future para imitar as requisições agendadas
+from urllib.parse import urlsplit  # Importa função para extrair o host de uma URL
+from keyword_filter import KEYWORDS, get_keyword_matcher  # Importa o filtro de palavras-chave compilado
+
+# Arquivo com a linha de base usada pela suíte de regressão
+BASELINE_PATH = 'benchmark_baseline.json'
+# Diretório com as páginas salvas de cada site (versões reduzidas, atualizadas com save-fixtures)
+FIXTURES_DIR = 'fixtures'
+# Aumento de pico de memória abaixo do qual a suíte de regressão não acusa regressão, qualquer que seja a base
+MEMORY_FLOOR = 1 << 20
+
+# Palavras usadas para montar títulos sintéticos parecidos com as manchetes reais
+FILLER_WORDS = ['governo', 'anuncia', 'plano', 'para', 'região', 'sul', 'após', 'semana', 'de', 'no', 'país',
+                'cidade', 'moradores', 'relatório', 'aponta', 'aumento', 'queda', 'investimento', 'novo', 'estudo']
+
+
+# Gera títulos sintéticos; cerca de um terço contém alguma palavra-chave
+def synthetic_titles(count, seed=42):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        words = rng.choices(FILLER_WORDS, k=rng.randint(6, 14))
+        if rng.random() < 0.33:
+            words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+        titles.append(' '.join(words).capitalize())
+    return titles
+
+
+# Reproduz o filtro original de fetch_news: lista recriada e busca linear por palavra-chave a cada título
+def legacy_keyword_filter(titles):
+    matched = []
+    for title in titles:
+        keywords = [
+            'meio ambiente', 'sustentabilidade', 'ecologia', 'natureza', 'poluição', 'enchente', 'chuvas',
+            'alagamento', 'queimadas', 'queimada', 'animais', 'desmatamento', 'clima',
+            'mudanças climáticas', 'fauna', 'flora', 'reflorestamento', 'reciclagem',
+            'biodiversidade', 'aquecimento global', 'impacto', 'ambiental', 'temperatura',
+            'temperaturas', 'frente fria', 'inundações', 'temporais', 'temporal', 'catástrofe',
+            'catástrofes', 'alerta', 'seca', 'secas', 'ecossistema', 'ecossistemas',
+            'risco', 'riscos', 'cheia', 'cheias'
+        ]
+        if any(keyword in title.lower() for keyword in keywords):
+            matched.append(title)
+    return matched
+
+
+# Filtro novo: expressão compilada uma vez, que também informa quais palavras-chave foram encontradas
+def compiled_keyword_filter(titles):
+    matcher = get_keyword_matcher()
+    return [title for title in titles if matcher.match(title)]
+
+
+# Mede o tempo de uma função sobre o corpus e retorna os títulos por segundo
+def measure(function, corpus, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(corpus)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def bench_keywords(args):
+    corpus = synthetic_titles(args.size)
+    get_keyword_matcher()  # Compila o filtro fora da medição, como acontece uma vez por processo
+    for name, function in (('legado', legacy_keyword_filter), ('compilado', compiled_keyword_filter)):
+        throughput = measure(function, corpus)
+        print(f"{name:>10}: {throughput:,.0f} títulos/s ({len(function(corpus))} filtrados de {len(corpus)})")
+
+
+# Reproduz a limpeza original de ai_analyzer.clean_text: quatro re.sub não compilados por documento
+def legacy_clean_text(text):
+    text = re.sub(r'\W', ' ', str(text))
+    text = text.lower()
+    text = re.sub(r'\s+[a-zA-Z]\s+', ' ', text)
+    text = re.sub(r'\s+', ' ', text, flags=re.I)
+    return text
+
+
+def bench_clean(args):
+    import pandas as pd
+    from ai_analyzer import TextCache, clean_text_series
+
+    print(f"{'títulos':>10}{'legado (s)':>14}{'vetorizado (s)':>16}{'com cache (s)':>15}{'ganho':>8}")
+    for size in args.sizes:
+        texts = pd.Series(synthetic_titles(size))
+        start = time.perf_counter()
+        expected = texts.apply(legacy_clean_text)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned = clean_text_series(texts)
+        vectorized = time.perf_counter() - start
+
+        cache = TextCache()
+        clean_text_series(texts, cache=cache)  # Primeira passada (treino) popula o cache
+        start = time.perf_counter()
+        clean_text_series(texts, cache=cache)  # Segunda passada (previsão) lê do cache
+        cached = time.perf_counter() - start
+
+        # Os títulos sintéticos não têm letras acentuadas isoladas, então o resultado deve ser idêntico
+        assert cleaned.equals(expected.astype(object)), "limpeza vetorizada divergiu da original"
+        print(f"{size:>10,}{legacy:>14.3f}{vectorized:>16.3f}{cached:>15.3f}{legacy / vectorized:>7.1f}x")
+
+
+# Nome do arquivo de fixture de um site, derivado do host da URL (ex.: g1.globo.com.html)
+def fixture_name(site):
+    return urlsplit(site['url']).netloc + '.html'
+
+
+# Gera uma página sintética com o layout de um site: manchetes cercadas de marcação que não interessa
+def synthetic_site_html(site, items=300, seed=42):
+    rng = random.Random(seed)
+    tag, link, class_name = site['headline_tag'], site['link_tag'], site['class_name']
+    parts = ['<html><head><script>var config = {"ads": true};</script><style>.x{color:red}</style></head><body>']
+    parts.append('<nav>' + ''.join(f'<a href="/menu/{i}">Menu {i}</a>' for i in range(40)) + '</nav>')
+    parts.append('<div class="item_list container">')
+    for i, title in enumerate(synthetic_titles(items, seed)):
+        parts.append(f'<div class="bloco"><div class="imagem"><img src="/img/{i}.jpg" alt="{title}"></div>'
+                     f'<{tag} class="titulo"><{link} class="{class_name}" href="/noticia/{i}">{title}</{link}></{tag}>'
+                     f'<p class="resumo">{" ".join(rng.choices(FILLER_WORDS, k=30))}</p>'
+                     f'<span class="data">{rng.randint(1, 28)}/05/2024</span></div>')
+    parts.append('<a href="/tags/meio-ambiente?page=2">Próxima</a></div>')
+    parts.append('<footer>' + ''.join(f'<a href="/rodape/{i}">Link {i}</a>' for i in range(60)) + '</footer>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+# Carrega as fixtures salvas em disco; sites sem fixture recebem uma página sintética
+def load_fixtures(websites, fixtures_dir=None):
+    pages = {}
+    for site in websites:
+        path = os.path.join(fixtures_dir, fixture_name(site)) if fixtures_dir else None
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                pages[fixture_name(site)] = (site, file.read())
+        else:
+            pages[fixture_name(site)] = (site, synthetic_site_html(site))
+    return pages
+
+
+# Baixa a página atual de cada site para usar como fixture nos benchmarks
+def save_fixtures(args):
+    from noticias import ConcurrentFetcher, websites
+    os.makedirs(args.fixtures, exist_ok=True)
+    with ConcurrentFetcher() as fetcher:
+        for site in websites:
+            url = site['url'] + ('?page=1' if 'agenciabrasil.ebc.com.br' in site['url'] else '')
+            html = fetcher.get(url).text
+            with open(os.path.join(args.fixtures, fixture_name(site)), 'w', encoding='utf-8') as file:
+                file.write(html)
+            print(f"Salvo {fixture_name(site)} ({len(html):,} caracteres)")
+
+
+# Melhor tempo de várias execuções de uma função
+def best_time(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Lê um campo de memória (VmRSS, VmHWM) de /proc/self/status, em bytes; None fora do Linux
+def proc_status(field):
+    try:
+        with open('/proc/self/status', 'r') as file:
+            for line in file:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# Pico de memória residente (RSS) acrescentado por uma função, em bytes
+# Ao contrário do tracemalloc, o RSS inclui as alocações feitas em C, como as da libxml2 usada pelo lxml
+def peak_rss(function):
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')  # Zera o pico (VmHWM) do processo, descartando o da preparação
+        before = proc_status('VmRSS')
+        function()
+        return proc_status('VmHWM') - before
+    except OSError:
+        import resource  # Sem /proc: usa o pico do processo inteiro, em KiB (bytes no macOS)
+        scale = 1 if sys.platform == 'darwin' else 1024
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        function()
+        return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * scale
+
+
+# Executa "benchmark.py probe ..." em um processo novo, para que as medições de memória não interfiram entre si
+def run_probe(*probe_args):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), 'probe', *map(str, probe_args)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+# Função de parsing de uma fixture: árvore completa (caminho original) ou só as manchetes (parse_news_items)
+def parse_function(site, html, backend, mode):
+    from bs4 import BeautifulSoup
+    from noticias import parse_news_items
+    tag, link = site['headline_tag'], site['link_tag']
+    if mode == 'completo':
+        def full_parse():
+            soup = BeautifulSoup(html, backend)
+            return [a for t in soup.find_all(tag) for a in t.find_all(link, href=True)]
+        return full_parse
+    return lambda: parse_news_items(html, tag, link, site['class_name'], backend)
+
+
+def bench_parse(args):
+    from bs4.builder import builder_registry
+    from noticias import PARSER_BACKENDS, websites
+
+    backends = [backend for backend in PARSER_BACKENDS if builder_registry.lookup(backend) is not None]
+    print(f"{'fixture':<32}{'backend':<13}{'modo':<10}{'tempo (ms)':>12}{'pico RSS (KiB)':>16}{'itens':>7}")
+    for name, (site, html) in load_fixtures(websites, args.fixtures).items():
+        for backend in backends:
+            for mode in ('completo', 'seletivo'):
+                function = parse_function(site, html, backend, mode)
+                elapsed = best_time(function, args.repeat)
+                peak = run_probe('parse', args.fixtures or '', name, backend, mode)['peak_bytes']
+                print(f"{name:<32}{backend:<13}{mode:<10}{elapsed * 1000:>12.2f}{peak / 1024:>16,.0f}{len(function()):>7}")
+
+
+# Medição feita no processo filho criado por run_probe; imprime o resultado em JSON
+def probe(args):
+    if args.kind == 'parse':
+        from noticias import websites
+        site, html = load_fixtures(websites, args.options[0] or None)[args.options[1]]
+        function = parse_function(site, html, args.options[2], args.options[3])
+        function()  # Aquecimento: importações e caches criados na primeira chamada não entram no pico
+        print(json.dumps({'peak_bytes': peak_rss(function)}))
+        return
+    name, size, repeat, fixtures = args.options
+    suite_args = argparse.Namespace(size=int(size), repeat=int(repeat), fixtures=fixtures or None)
+    with contextlib.redirect_stdout(io.StringIO()):  # As funções medidas imprimem mensagens de depuração
+        run = REGRESSION_SUITE[name](suite_args)
+        # O pico é medido na primeira execução, no processo ainda novo: depois dela o alocador já reservou
+        # a memória, e as execuções seguintes quase não aumentam o RSS
+        units = 0
+
+        def first_run():
+            nonlocal units
+            units = run()  # Também informa quantas unidades são processadas
+        peak = peak_rss(first_run)
+        elapsed = best_time(run, suite_args.repeat)  # A primeira execução serviu de aquecimento
+    print(json.dumps({'throughput': units / elapsed, 'peak_bytes': peak}))
+
+
+# Resposta montada a partir de uma fixture, com os atributos usados por fetch_news
+class FixtureResponse:
+    def __init__(self, html):
+        self.text = html
+        self.content = html.encode('utf-8')
+        self.status_code = 200
+        self.headers = {}
+
+
+# Substitui o ConcurrentFetcher: responde cada URL com a fixture do seu host, sem acessar a rede
+class FixtureFetcher:
+    def __init__(self, pages):
+        self.pages = {name: html for name, (site, html) in pages.items()}
+        self.requests = 0
+
+    def get(self, url, headers=None):
+        self.requests += 1
+        return FixtureResponse(self.pages[urlsplit(url).netloc + '.html'])
+
+    def submit(self, url, headers=None):
+        future = Future()
+        future.set_result(self.get(url, headers))
+        return future
+
+
+# Notícias sintéticas com título e introdução, no formato dos arquivos classificados
+def synthetic_records(count, seed=42):
+    rng = random.Random(seed)
+    return [{'title': title, 'introducao': ' '.join(rng.choices(FILLER_WORDS, k=25))}
+            for title in synthetic_titles(count, seed)]
+
+
+# Busca as fixtures de todos os sites com fetch_news; a unidade é a página processada
+def regress_scrape(args):
+    from noticias import fetch_news, websites
+    pages = load_fixtures(websites, args.fixtures)
+
+    def run():
+        fetcher = FixtureFetcher(pages)
+        for site in websites:
+            fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name'],
+                       fetcher=fetcher, keywords=site.get('keywords'))
+        return fetcher.requests
+    return run
+
+
+# Limpa um corpus sintético com clean_text_series; a unidade é o título
+def regress_clean(args):
+    from ai_analyzer import clean_text_series
+    texts = synthetic_titles(args.size)
+
+    def run():
+        clean_text_series(texts)
+        return len(texts)
+    return run
+
+
+# Classifica um corpus sintético com predict_new_data; a unidade é a notícia
+def regress_predict(args):
+    import ai_analyzer
+    model = ai_analyzer.train_and_evaluate(ai_analyzer.train_data_file_path)
+    directory = tempfile.mkdtemp()
+    analysis_path = os.path.join(directory, 'analysis.json')
+    records = synthetic_records(args.size)
+    with open(analysis_path, 'w', encoding='utf-8') as file:
+        json.dump(records, file, ensure_ascii=False)
+
+    def run():
+        ai_analyzer.TEXT_CACHE = ai_analyzer.TextCache()  # Mede a limpeza também, como na primeira execução do processo
+        ai_analyzer.predict_new_data(model, analysis_path, os.path.join(directory, 'result.json'),
+                                     os.path.join(directory, 'news.json'))
+        return len(records)
+    return run
+
+
+# Lê e desenha o gráfico de cada arquivo de resultados com create_pie_chart; a unidade é o gráfico
+def regress_render(args):
+    import glob
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import testgraphic
+    filenames = sorted(glob.glob('json/dia*result.json')) + ['json/results.json']
+
+    def run():
+        testgraphic.file_cache.clear()  # Inclui a leitura dos arquivos na medição
+        for filename in filenames:
+            labels, sizes = testgraphic.load_data(filename)
+            FigureCanvasAgg(testgraphic.create_pie_chart(labels, sizes, "Analysis Results")).draw()
+        return len(filenames)
+    return run
+
+
+REGRESSION_SUITE = {'scrape': regress_scrape, 'clean': regress_clean, 'predict': regress_predict, 'render': regress_render}
+
+
+# Executa a suíte e retorna, por benchmark, a vazão (unidades por segundo) e o pico de memória residente
+# Cada benchmark roda em um processo novo, para que o RSS de um não interfira no do outro
+def run_suite(args):
+    results = {}
+    for name in args.only or REGRESSION_SUITE:
+        results[name] = run_probe('regress', name, args.size, args.repeat, args.fixtures or '')
+        print(f"{name:<10}{results[name]['throughput']:>14,.1f}/s{results[name]['peak_bytes'] / 1024:>14,.0f} KiB")
+    return results
+
+
+# Compara os resultados com a linha de base; retorna a lista de regressões encontradas
+# O pico de memória só conta como regressão quando sobe mais que memory_threshold e mais que memory_floor bytes
+def find_regressions(results, baseline, threshold, memory_threshold, memory_floor=MEMORY_FLOOR):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue  # Benchmark novo, ainda sem linha de base
+        if result['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(f"{name}: vazão {result['throughput']:,.1f}/s abaixo da base {base['throughput']:,.1f}/s")
+        if result['peak_bytes'] - base['peak_bytes'] > max(base['peak_bytes'] * memory_threshold, memory_floor):
+            regressions.append(f"{name}: pico {result['peak_bytes'] / 1024:,.0f} KiB acima da base "
+                               f"{base['peak_bytes'] / 1024:,.0f} KiB")
+    return regressions
+
+
+# Parâmetros que definem a carga medida; a linha de base só é comparada com execuções que usam os mesmos
+def suite_params(args):
+    from noticias import websites
+    digest = hashlib.sha256()
+    for name, (site, html) in load_fixtures(websites, args.fixtures).items():
+        digest.update(name.encode('utf-8') + b'\0' + html.encode('utf-8') + b'\0')
+    return {'size': args.size, 'repeat': args.repeat, 'fixtures': args.fixtures or None,
+            'fixtures_sha256': digest.hexdigest()}
+
+
+def bench_regress(args):
+    params = suite_params(args)
+    baseline = None
+    if not args.save_baseline:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"Linha de base {args.baseline} não encontrada; rode com --save-baseline primeiro.")
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('params') != params:  # Linhas de base antigas não registravam os parâmetros
+            sys.exit(f"A linha de base {args.baseline} foi medida com {baseline.get('params')}, e esta execução usa "
+                     f"{params}; rode com os mesmos parâmetros ou salve uma nova linha de base com --save-baseline.")
+    print(f"{'benchmark':<10}{'vazão':>16}{'pico':>18}")
+    results = run_suite(args)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({'params': params, 'results': results}, file, indent=4)
+        print(f"Linha de base salva em {args.baseline}")
+        return
+    regressions = find_regressions(results, baseline['results'], args.threshold, args.memory_threshold,
+                                   args.memory_floor)
+    for regression in regressions:
+        print(f"REGRESSÃO {regression}")
+    if regressions:
+        sys.exit(1)
+    print("Sem regressões em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do projeto.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    keywords_parser = commands.add_parser('keywords', help="filtro de palavras-chave: legado vs compilado")
+    keywords_parser.add_argument('--size', type=int, default=200_000, help="quantidade de títulos sintéticos")
+    keywords_parser.set_defaults(run=bench_keywords)
+
+    clean_parser = commands.add_parser('clean', help="limpeza de texto: legado vs vetorizada vs cache")
+    clean_parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000],
+                              help="tamanhos dos corpora sintéticos")
+    clean_parser.set_defaults(run=bench_clean)
+
+    parse_parser = commands.add_parser('parse', help="tempo e pico de memória do parsing por backend")
+    parse_parser.add_argument('--fixtures', default=FIXTURES_DIR,
+                              help="diretório com as páginas salvas (sites sem página salva usam uma sintética)")
+    parse_parser.add_argument('--repeat', type=int, default=5, help="execuções por medição")
+    parse_parser.set_defaults(run=bench_parse)
+
+    fixtures_parser = commands.add_parser('save-fixtures', help="baixa a página atual de cada site")
+    fixtures_parser.add_argument('fixtures', help="diretório de destino")
+    fixtures_parser.set_defaults(run=save_fixtures)
+
+    regress_parser = commands.add_parser('regress', help="suíte de regressão: compara vazão e pico de memória com a linha de base")
+    regress_parser.add_argument('--baseline', default=BASELINE_PATH, help="arquivo JSON da linha de base")
+    regress_parser.add_argument('--save-baseline', action='store_true', help="grava os resultados como nova linha de base")
+    regress_parser.add_argument('--threshold', type=float, default=0.25, help="queda de vazão tolerada (0.25 = 25%%)")
+    regress_parser.add_argument('--memory-threshold', type=float, default=0.10, help="aumento de pico de memória tolerado")
+    regress_parser.add_argument('--memory-floor', type=int, default=MEMORY_FLOOR,
+                                help="aumento de pico, em bytes, abaixo do qual nunca há regressão (padrão: 1 MiB)")
+    regress_parser.add_argument('--only', nargs='+', choices=list(REGRESSION_SUITE), help="roda só estes benchmarks")
+    regress_parser.add_argument('--fixtures', default=FIXTURES_DIR,
+                                help="diretório com as páginas salvas (sites sem página salva usam uma sintética)")
+    regress_parser.add_argument('--size', type=int, default=20_000, help="tamanho dos corpora sintéticos")
+    regress_parser.add_argument('--repeat', type=int, default=3, help="execuções por medição")
+    regress_parser.set_defaults(run=bench_regress)
+
+    probe_parser = commands.add_parser('probe', help="uso interno: medição de memória em um processo separado")
+    probe_parser.add_argument('kind', choices=['parse', 'regress'])
+    probe_parser.add_argument('options', nargs='*')
+    probe_parser.set_defaults(run=probe)
+
+    args = parser.parse_args()
+    args.run(args)
@@ -0,0 +1,80 @@
+import sqlite3
+import hashlib
+import threading
+
+#Caminho padrão do banco com o estado das buscas entre execuções
+CRAWL_STATE_PATH = 'json/crawl_state.db'
+
+#Gera uma chave curta e estável para um link ou título já visto
+def item_key(kind, value):
+    return hashlib.blake2b(f"{kind}:{value}".encode('utf-8'), digest_size=16).digest()
+
+#Guarda em SQLite os validadores HTTP de cada URL e o índice de notícias já vistas
+class CrawlState:
+    def __init__(self, path=CRAWL_STATE_PATH):
+        self.connection = sqlite3.connect(path, check_same_thread=False)  #Compartilhado entre as threads de busca
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen_items (key BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    #Retorna os cabeçalhos para uma requisição condicional (If-None-Match / If-Modified-Since)
+    def conditional_headers(self, url):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified FROM http_cache WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    #Salva o ETag e o Last-Modified de uma resposta bem-sucedida
+    def remember_response(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified) VALUES (?, ?, ?)",
+                (url, etag, last_modified))
+
+    #Verifica se o link ou o título já foram vistos em alguma execução anterior
+    def is_seen(self, link, title):
+        keys = (item_key('link', link), item_key('title', title))
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM seen_items WHERE key IN (?, ?) LIMIT 1", keys).fetchone()
+        return row is not None
+
+    #Adiciona os pares (título, link) ao índice de notícias vistas
+    def mark_seen(self, entries):
+        rows = [(item_key(kind, value),) for title, link in entries
+                for kind, value in (('link', link), ('title', title))]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO seen_items (key) VALUES (?)", rows)
+
+    #Esquece os validadores HTTP e as notícias vistas (usado por uma busca completa, que preenche tudo de novo)
+    def reset(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM http_cache")
+            self.connection.execute("DELETE FROM seen_items")
+
+    def is_empty(self):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM seen_items LIMIT 1").fetchone() is None
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,130 @@
+import sqlite3
+import hashlib
+import re
+import zlib
+import numpy as np
+from keyword_filter import normalize_text
+
+#Caminho padrão do índice de notícias quase duplicadas, mantido entre execuções
+DEDUP_INDEX_PATH = 'json/dedup.db'
+
+#Configuração do MinHash/LSH: 64 permutações divididas em 16 faixas de 4 linhas
+#Duas notícias com similaridade de Jaccard s caem no mesmo balde com probabilidade 1 - (1 - s^4)^16
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.5  #Similaridade estimada mínima para juntar a notícia a um grupo
+
+#Permutações fixas (a * x + b) mod p; com x de 32 bits o produto cabe em um uint64 sem estourar
+HASH_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+WORD_RE = re.compile(r'\w+')
+
+#Texto usado na comparação: título e introdução, sem acentos e em minúsculas
+def article_text(record):
+    parts = [record.get(field) for field in ('title', 'introducao')]
+    return normalize_text(' '.join(part for part in parts if isinstance(part, str)))
+
+#Conjunto de palavras e pares de palavras consecutivas do texto normalizado
+def shingles(text):
+    words = WORD_RE.findall(text)
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+#Assinatura MinHash: para cada permutação, o menor hash entre os shingles do texto
+def minhash(shingle_set):
+    if not shingle_set:
+        return None
+    #crc32 basta como hash de 32 bits dos shingles e é estável entre execuções, ao contrário de hash()
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set),
+                         dtype=np.uint64, count=len(shingle_set))
+    permuted = (np.outer(hashes, PERM_A) + PERM_B) % HASH_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+#Chave de cada faixa da assinatura, usada como balde do LSH; o número da faixa entra na chave
+def band_keys(signature):
+    return [hashlib.blake2b(bytes([band]) + signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+            for band in range(BANDS)]
+
+#Chave estável de uma notícia: o link junto com o texto normalizado
+#O link sozinho não serve: nos arquivos diários ele é o endereço da seção, igual para todas as notícias do site
+def article_key(record, text):
+    link = record.get('link')
+    value = f"{link if isinstance(link, str) else ''}\n{text}"
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+
+#Guarda em SQLite os grupos de notícias quase duplicadas e os baldes LSH do representante de cada grupo
+#A busca consulta um balde por faixa pelo índice, sem percorrer os grupos já conhecidos
+class DedupIndex:
+    def __init__(self, path=DEDUP_INDEX_PATH):
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS clusters (id INTEGER PRIMARY KEY, signature BLOB, text TEXT)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (bucket BLOB, cluster INTEGER, "
+                "PRIMARY KEY (bucket, cluster)) WITHOUT ROWID")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles (key BLOB PRIMARY KEY, cluster INTEGER) WITHOUT ROWID")
+
+    #Procura o grupo mais parecido entre os candidatos que dividem algum balde com a assinatura
+    def find_cluster(self, signature, buckets):
+        placeholders = ', '.join('?' * len(buckets))
+        rows = self.connection.execute(
+            f"SELECT id, signature FROM clusters WHERE id IN "
+            f"(SELECT cluster FROM buckets WHERE bucket IN ({placeholders})) ORDER BY id", buckets).fetchall()
+        if not rows:
+            return None
+        stored = np.frombuffer(b''.join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+        similarity = (stored == signature).mean(axis=1)  #Estimativa do Jaccard com cada candidato
+        best = int(similarity.argmax())  #Em caso de empate, fica o grupo mais antigo
+        return rows[best][0] if similarity[best] >= SIMILARITY_THRESHOLD else None
+
+    #Cria um grupo tendo a notícia como representante
+    def new_cluster(self, signature, buckets, text):
+        cursor = self.connection.execute("INSERT INTO clusters (signature, text) VALUES (?, ?)",
+                                         (signature.tobytes() if signature is not None else None, text))
+        cluster = cursor.lastrowid
+        #Textos vazios não têm baldes: cada um fica no seu grupo
+        self.connection.executemany("INSERT OR IGNORE INTO buckets (bucket, cluster) VALUES (?, ?)",
+                                    [(bucket, cluster) for bucket in buckets])
+        return cluster
+
+    #Atribui um grupo a cada notícia, inserindo as novas no índice; notícias já indexadas mantêm o seu grupo
+    #texts são os textos originais de cada notícia: o do primeiro membro é guardado como texto do grupo
+    #Retorna a lista de ids dos grupos, na ordem das notícias
+    def assign(self, records, texts):
+        clusters = []
+        with self.connection:  #Uma única transação para todas as inserções
+            for record, original in zip(records, texts):
+                text = article_text(record)
+                key = article_key(record, text)
+                row = self.connection.execute("SELECT cluster FROM articles WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    signature = minhash(shingles(text))
+                    buckets = band_keys(signature) if signature is not None else []
+                    cluster = self.find_cluster(signature, buckets) if buckets else None
+                    if cluster is None:
+                        cluster = self.new_cluster(signature, buckets, str(original))
+                    self.connection.execute("INSERT INTO articles (key, cluster) VALUES (?, ?)", (key, cluster))
+                    row = (cluster,)
+                clusters.append(row[0])
+        return clusters
+
+    #Texto do representante de cada grupo, usado para classificar o grupo uma única vez
+    def representative_texts(self, clusters):
+        texts = {}
+        for cluster in set(clusters):
+            texts[cluster], = self.connection.execute("SELECT text FROM clusters WHERE id = ?", (cluster,)).fetchone()
+        return texts
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
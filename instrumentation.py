@@ -0,0 +1,121 @@
+import cProfile  # Importa o profiler de CPU da biblioteca padrão
+import io  # Importa a biblioteca io para capturar o relatório do profiler
+import json  # Importa a biblioteca json para exportar as métricas
+import os  # Importa a biblioteca os para criar o diretório do arquivo de métricas
+import pstats  # Importa a biblioteca pstats para resumir o resultado do profiler
+import sys  # Importa a biblioteca sys para trocar o profiler de cada thread
+import threading  # Importa a biblioteca threading para proteger os contadores entre threads
+import time  # Importa a biblioteca time para medir o tempo das etapas
+import tracemalloc  # Importa a biblioteca tracemalloc para medir o pico de memória
+from contextlib import contextmanager  # Importa o decorador para criar gerenciadores de contexto
+from datetime import datetime  # Importa datetime para registrar quando as métricas foram coletadas
+
+# Métricas coletadas no processo: tempo por etapa e contadores
+stages = {}
+counters = {}
+lock = threading.Lock()
+profiler = None  # Profiler de CPU da thread que habilitou o profiling
+thread_profilers = []  # Profilers das threads criadas durante o profiling
+
+
+# Mede o tempo de uma etapa; chamadas repetidas da mesma etapa são somadas
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with lock:
+            entry = stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += elapsed
+            entry['calls'] += 1
+
+
+# Incrementa um contador (páginas buscadas, bytes baixados, documentos classificados...)
+def count(name, amount=1):
+    with lock:
+        counters[name] = counters.get(name, 0) + amount
+
+
+# Zera as métricas coletadas
+def reset():
+    with lock:
+        stages.clear()
+        counters.clear()
+
+
+# Até o Python 3.11 o cProfile só acompanha a thread em que foi habilitado; a partir do 3.12 ele usa
+# sys.monitoring, que acompanha todas as threads, e só um profiler pode estar ativo por vez
+PROFILER_PER_THREAD = sys.version_info < (3, 12)
+
+
+# Habilita o profiler de CPU (cProfile) e/ou o rastreamento de memória (tracemalloc)
+# Até o Python 3.11, cada thread criada depois daqui (etapas do main.py, buscas e parsing) recebe o seu
+# próprio profiler, e todos são somados no relatório; no 3.12 ou mais novo, o profiler único já as cobre
+def start_profiling(cpu=True, memory=True):
+    global profiler
+    if cpu and profiler is None:
+        profiler = cProfile.Profile()
+        if PROFILER_PER_THREAD:
+            threading.setprofile(profile_thread)
+        profiler.enable()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# Instalado por threading.setprofile: na primeira chamada dentro de uma nova thread, liga um profiler para ela
+def profile_thread(frame, event, arg):
+    sys.setprofile(None)
+    thread_profiler = cProfile.Profile()
+    with lock:
+        thread_profilers.append(thread_profiler)
+    thread_profiler.enable()
+
+
+# Desliga o profiler e devolve o resumo das funções mais caras e o pico de memória
+def stop_profiling(top=25):
+    global profiler
+    report = {}
+    if profiler is not None:
+        if PROFILER_PER_THREAD:
+            threading.setprofile(None)
+        profiler.disable()
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        with lock:
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+            report['profiled_threads'] = len(thread_profilers) + 1
+            thread_profilers.clear()
+        stats.sort_stats('cumulative').print_stats(top)
+        report['cpu_profile'] = output.getvalue()
+        profiler = None
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report['memory'] = {'current_bytes': current, 'peak_bytes': peak}
+        tracemalloc.stop()
+    return report
+
+
+# Retorna as métricas coletadas até agora
+def snapshot():
+    with lock:
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'stages': {name: dict(entry) for name, entry in stages.items()},
+            'counters': dict(counters),
+        }
+
+
+# Exporta as métricas (e o resultado do profiler, se houver) em JSON
+def export_json(path, profile=None):
+    data = snapshot()
+    if profile:
+        data['profile'] = profile
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=4)
+    return data
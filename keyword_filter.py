@@ -0,0 +1,90 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+#Palavras-chave padrão usadas para filtrar as notícias ambientais
+KEYWORDS = (
+    'meio ambiente', 'sustentabilidade', 'ecologia', 'natureza', 'poluição', 'enchente', 'chuvas',
+    'alagamento', 'queimadas', 'queimada', 'animais', 'desmatamento', 'clima',
+    'mudanças climáticas', 'fauna', 'flora', 'reflorestamento', 'reciclagem',
+    'biodiversidade', 'aquecimento global', 'impacto', 'ambiental', 'temperatura',
+    'temperaturas', 'frente fria', 'inundações', 'temporais', 'temporal', 'catástrofe',
+    'catástrofes', 'alerta', 'seca', 'secas', 'ecossistema', 'ecossistemas',
+    'risco', 'riscos', 'cheia', 'cheias'
+)
+
+#Tabela que descarta os acentos combinantes (U+0300 a U+036F) após a decomposição NFKD
+STRIP_ACCENTS = dict.fromkeys(range(0x300, 0x370))
+
+#Remove acentos e converte para minúsculas ("Poluição" -> "poluicao")
+def normalize_text(text):
+    text = text.casefold()
+    if text.isascii():
+        return text  #Caminho rápido: nada a decompor
+    return unicodedata.normalize('NFKD', text).translate(STRIP_ACCENTS)
+
+#Para cada letra sem acento, a classe com as suas variantes acentuadas ("a" -> "[aáàâãä...]")
+def accent_classes():
+    variants = {}
+    for code in range(0xC0, 0x250):
+        char = chr(code)
+        base = unicodedata.normalize('NFD', char)[0]
+        if base != char and base.isascii() and char == char.casefold():
+            variants.setdefault(base, []).append(char)
+    return {base: '[' + base + ''.join(chars) + ']' for base, chars in variants.items()}
+
+ACCENT_CLASSES = accent_classes()
+
+#Monta uma alternância fatorada por prefixos comuns ("seca", "secas" -> "seca(?:s)?"),
+#o que evita que o motor de regex teste cada palavra-chave desde o início
+def trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  #Marca o fim de uma palavra
+
+    def build(node):
+        optional = '' in node
+        branches = []
+        for char in sorted(key for key in node if key):
+            piece = r'\s+' if char == ' ' else ACCENT_CLASSES.get(char, re.escape(char))
+            branches.append(piece + build(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if optional:
+            #Ramos mais longos são tentados primeiro e o fim da palavra fica como alternativa
+            return '(?:' + body + ')?' if len(branches) > 1 or len(branches[0]) > 1 else body + '?'
+        return body
+
+    return '(?:' + build(trie) + ')'
+
+#Filtro de palavras-chave compilado uma única vez em uma só expressão regular
+class KeywordMatcher:
+    def __init__(self, keywords=KEYWORDS):
+        self.keywords = tuple(keywords)
+        #Mapeia a forma normalizada de volta para a palavra-chave original
+        self.by_normalized = {}
+        for keyword in self.keywords:
+            self.by_normalized.setdefault(normalize_text(keyword), keyword)
+        #Só o início da palavra é ancorado: flexões como "enchentes" e "alertas" continuam aceitas
+        self.pattern = re.compile(r'\b' + trie_pattern(self.by_normalized))
+
+    #Retorna as palavras-chave encontradas no texto, sem repetição e na ordem em que aparecem
+    def match(self, text):
+        hits = {}
+        #Os acentos são tratados pela própria expressão; basta padronizar a forma NFC e a caixa
+        for found in self.pattern.finditer(unicodedata.normalize('NFC', text).casefold()):
+            keyword = self.by_normalized[' '.join(normalize_text(found.group()).split())]
+            hits.setdefault(keyword, None)
+        return list(hits)
+
+    def __call__(self, text):
+        return self.match(text)
+
+#Reutiliza o mesmo filtro para a mesma lista de palavras-chave durante todo o processo
+@lru_cache(maxsize=None)
+def get_keyword_matcher(keywords=KEYWORDS):
+    return KeywordMatcher(keywords)
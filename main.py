@@ -1,19 +1,75 @@
-import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import noticias
+import ai_analyzer
+import instrumentation
 
-def run_script(script_name):
-    os.system(f"python {script_name}")
+#Executa uma etapa medindo o tempo gasto; retorna o resultado da etapa
+def run_stage(name, timings, function, *args, **kwargs):
+    start = time.perf_counter()
+    with instrumentation.stage(name):
+        result = function(*args, **kwargs)
+    timings[name] = time.perf_counter() - start
+    print(f"[{name}] concluído em {timings[name]:.2f}s")
+    return result
 
-if __name__ == "__main__":
-    #Rodar noticias.py
-    run_script("noticias.py")
+#Roda todas as etapas no mesmo processo, passando as notícias direto da busca para a classificação
+#Com metrics, grava os tempos e contadores em JSON; profile liga o cProfile e o tracemalloc durante a execução
+def run_pipeline(headless=False, full=False, retrain=False, streaming=False, metrics=None, profile=False,
+                 deduplicate=True):
+    timings = {}
+    if profile:
+        instrumentation.start_profiling()
+    start = time.perf_counter()
+
+    #A busca das notícias e o carregamento do modelo não dependem um do outro: rodam ao mesmo tempo
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        scrape = pool.submit(run_stage, 'busca', timings, noticias.main, full=full)
+        model = pool.submit(run_stage, 'modelo', timings, ai_analyzer.load_model, retrain=retrain, streaming=streaming)
+        trained_model, model_id, source = model.result()
+        model_ready = time.perf_counter()
+        news_data = scrape.result()
+        #A espera pela busca depois de o modelo ficar pronto não conta no cold start do modelo
+        ai_analyzer.exclude_scrape_wait(time.perf_counter() - model_ready)
+
+    if trained_model:
+        #Só as notícias novas são classificadas; depois de uma busca completa, o histórico de previsões é refeito
+        run_stage('classificação', timings, ai_analyzer.classify_all, trained_model, news_data, deduplicate, full)
+    timings['total'] = time.perf_counter() - start
 
-    #Rodar ai_analyzer.py/
-    run_script("ai_analyzer.py")
+    print("Tempo por etapa:")
+    for name, seconds in timings.items():
+        print(f"  {name:<15}{seconds:>8.2f}s")
+    for name, value in instrumentation.snapshot()['counters'].items():
+        print(f"  {name:<25}{value:>12,}")
 
-    #Rodar testgraphic.py
-    run_script("testgraphic.py")
+    report = instrumentation.stop_profiling() if profile else None
+    if metrics:
+        instrumentation.export_json(metrics, report)
+        print(f"Métricas salvas em {metrics}")
+
+    #A interface só é importada quando usada: o modo headless não carrega tkinter nem matplotlib
+    if not headless:
+        import testgraphic
+        testgraphic.run_gui()
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca, classifica e exibe as notícias ambientais.")
+    parser.add_argument('--headless', action='store_true', help="não abre a interface gráfica")
+    parser.add_argument('--full', action='store_true', help="busca todas as páginas e reescreve o armazenamento de notícias")
+    parser.add_argument('--retrain', action='store_true', help="treina o modelo mesmo que exista um salvo")
+    parser.add_argument('--streaming', action='store_true', help="classifica com o modelo incremental salvo")
+    parser.add_argument('--no-dedup', action='store_true', help="não agrupa as notícias quase duplicadas")
+    parser.add_argument('--metrics', metavar='ARQUIVO', help="salva tempos por etapa e contadores em JSON")
+    parser.add_argument('--profile', action='store_true', help="inclui nas métricas o cProfile e o pico de memória")
+    args = parser.parse_args()
+    run_pipeline(headless=args.headless, full=args.full, retrain=args.retrain, streaming=args.streaming,
+                 metrics=args.metrics, profile=args.profile, deduplicate=not args.no_dedup)
 
 
 #Este código é responsável apenas pela utilização correta do todo.
-#Utilizando apenas este é possível rodar todo o código pois ele
-#"automatiza" os códigos abrindo um por um em sua determinada ordem.
\ No newline at end of file
+#Utilizando apenas este é possível rodar todo o código: ele executa
+#as etapas de busca, classificação e exibição em sua determinada ordem,
+#todas no mesmo processo.
@@ -0,0 +1,158 @@
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+import json  # Importa a biblioteca json para salvar o relatório
+import os  # Importa a biblioteca os para manipular caminhos de arquivos
+import pickle  # Importa a biblioteca pickle para medir o tamanho de cada modelo
+import tempfile  # Importa a biblioteca tempfile para o cache dos transformadores
+import math  # Importa a biblioteca math para descartar candidatos que falharam
+import time  # Importa a biblioteca time para medir a latência de previsão
+from datetime import datetime  # Importa datetime para registrar quando a busca foi feita
+from joblib import Memory, Parallel, delayed  # Importa o cache em disco e o paralelismo em processos do joblib
+from sklearn.base import clone  # Importa função para copiar um pipeline sem os ajustes
+from sklearn.metrics import accuracy_score  # Importa função para calcular a acurácia da predição
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold, train_test_split
+from ai_analyzer import HYPERPARAMS, MODEL_DIR, TEXT_CACHE, build_pipeline, clean_text_series, load_dataset
+
+# Arquivo onde o relatório da busca é salvo
+SEARCH_REPORT = os.path.join(MODEL_DIR, 'model_search.json')
+
+# Nome de cada hiperparâmetro dentro do pipeline criado por build_pipeline
+PIPELINE_PARAMS = {
+    'max_features': 'tfidfvectorizer__max_features',
+    'ngram_range': 'tfidfvectorizer__ngram_range',
+    'n_components': 'truncatedsvd__n_components',
+    'solver': 'lineardiscriminantanalysis__solver',
+    'shrinkage': 'lineardiscriminantanalysis__shrinkage',
+}
+
+# Valores testados para cada hiperparâmetro
+PARAM_GRID = {
+    'max_features': [500, 1000, 2000, 5000],
+    'ngram_range': [(1, 1), (1, 2)],
+    'n_components': [50, 100, 200],
+}
+
+# Combinações testadas do LDA: sem shrinkage, os solvers lsqr/eigen ficam numericamente instáveis
+# com a covariância quase singular do SVD, por isso a opção sem shrinkage usa o solver 'svd'
+LDA_OPTIONS = [
+    {'solver': ['lsqr'], 'shrinkage': ['auto']},
+    {'solver': ['svd'], 'shrinkage': [None]},
+]
+
+
+# Função para traduzir os hiperparâmetros do pipeline de volta para os nomes de HYPERPARAMS
+def to_hyperparams(pipeline_params):
+    names = {value: key for key, value in PIPELINE_PARAMS.items()}
+    return {**HYPERPARAMS, **{names[key]: value for key, value in pipeline_params.items()}}
+
+
+# Função para medir a latência média de previsão por documento
+def predict_latency(model, texts, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict(texts)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts)
+
+
+# Função para treinar uma configuração no conjunto de treino inteiro (executada em um processo separado)
+# Retorna o modelo e o tempo de treino sem o cache, isto é, incluindo o TF-IDF e o SVD
+def fit_candidate(pipeline, pipeline_params, x_train, y_train):
+    model = clone(pipeline).set_params(memory=None, **pipeline_params)
+    try:
+        start = time.perf_counter()
+        model.fit(x_train, y_train)
+        return model, time.perf_counter() - start
+    except ValueError as e:  # Ex.: n_components maior que o vocabulário gerado pelo TF-IDF
+        print(f"Configuração inválida {pipeline_params}: {e}")
+        return None, None
+
+
+# Função para executar a busca de hiperparâmetros com validação cruzada em todos os núcleos
+def search(dataset_path, n_iter=None, folds=5, n_jobs=-1, params=HYPERPARAMS):
+    df = load_dataset(dataset_path)  # Carrega o dataset de treino
+    texts = clean_text_series(df['title'] + " " + df.get('introducao', ''), cache=TEXT_CACHE)
+    # Mesma divisão de train_and_evaluate; a validação cruzada usa só a parte de treino
+    x_train, x_test, y_train, y_test = train_test_split(texts, df['label'], test_size=params['test_size'],
+                                                        random_state=params['random_state'], stratify=df['label'])
+    grid = [{PIPELINE_PARAMS[key]: values for key, values in {**PARAM_GRID, **option}.items()} for option in LDA_OPTIONS]
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=params['random_state'])
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # O cache evita reajustar o TF-IDF e o SVD quando só os passos seguintes mudam entre candidatos
+        pipeline = build_pipeline(params, memory=Memory(cache_dir, verbose=0))
+        if n_iter:
+            searcher = RandomizedSearchCV(pipeline, grid, n_iter=n_iter, cv=cv, n_jobs=n_jobs,
+                                          random_state=params['random_state'], error_score=math.nan)
+        else:
+            searcher = GridSearchCV(pipeline, grid, cv=cv, n_jobs=n_jobs, error_score=math.nan)
+        searcher.fit(x_train, y_train)
+
+    results = searcher.cv_results_
+    # Descarta as configurações que falharam em alguma partição (score nan)
+    valid = [index for index, score in enumerate(results['mean_test_score']) if math.isfinite(score)]
+    candidates = [results['params'][index] for index in valid]
+    # Retreina cada configuração no treino inteiro em paralelo para medir latência, tamanho e acurácia no teste
+    fitted = Parallel(n_jobs=n_jobs)(delayed(fit_candidate)(pipeline, candidate, x_train, y_train)
+                                     for candidate in candidates)
+
+    report = []
+    for index, candidate, (model, fit_time) in zip(valid, candidates, fitted):
+        if model is None:
+            continue
+        report.append({
+            'params': to_hyperparams(candidate),
+            'cv_accuracy': float(results['mean_test_score'][index]),
+            'cv_accuracy_std': float(results['std_test_score'][index]),
+            # mean_fit_time da busca não serve: com o cache, candidatos que reaproveitam o TF-IDF/SVD medem só o LDA
+            'fit_time_s': fit_time,
+            'holdout_accuracy': float(accuracy_score(y_test, model.predict(x_test))),
+            'predict_latency_ms_per_doc': predict_latency(model, x_test) * 1000,  # Medida no processo principal
+            'model_size_bytes': len(pickle.dumps(model)),
+        })
+    return report
+
+
+# Função para escolher a configuração mais rápida cuja acurácia fica dentro da margem da melhor
+# Entre as configurações dentro da margem na validação cruzada, descarta as que ficam fora da margem no
+# conjunto de teste separado; se nenhuma sobrar, fica a de melhor acurácia na validação cruzada
+def fastest_within_budget(report, accuracy_budget):
+    best = max(report, key=lambda entry: entry['cv_accuracy'])
+    best_holdout = max(entry['holdout_accuracy'] for entry in report)
+    within_cv = [entry for entry in report if entry['cv_accuracy'] >= best['cv_accuracy'] - accuracy_budget]
+    eligible = [entry for entry in within_cv if entry['holdout_accuracy'] >= best_holdout - accuracy_budget]
+    return min(eligible or [best], key=lambda entry: entry['predict_latency_ms_per_doc'])
+
+
+# Função para salvar o relatório em JSON
+# O conteúdo é montado antes de abrir o arquivo e gravado em um arquivo temporário renomeado no final,
+# para que uma falha não deixe um relatório vazio ou pela metade
+def save_report(report, accuracy_budget, report_path=SEARCH_REPORT):
+    payload = {'created': datetime.now().isoformat(timespec='seconds'),
+               'accuracy_budget': accuracy_budget,
+               'fastest_within_budget': fastest_within_budget(report, accuracy_budget),
+               'candidates': sorted(report, key=lambda entry: -entry['cv_accuracy'])}
+    directory = os.path.dirname(report_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as file:
+        json.dump(payload, file, ensure_ascii=False, indent=4)
+    os.replace(file.name, report_path)
+    return payload
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do classificador de notícias.")
+    parser.add_argument('--dataset', default='json/news_data_train.json', help="arquivo de notícias rotuladas")
+    parser.add_argument('--random', type=int, metavar='N', help="testa N configurações aleatórias em vez da grade toda")
+    parser.add_argument('--folds', type=int, default=5, help="número de partições da validação cruzada")
+    parser.add_argument('--jobs', type=int, default=-1, help="processos usados (-1 = todos os núcleos)")
+    parser.add_argument('--accuracy-budget', type=float, default=0.01,
+                        help="perda de acurácia aceita ao escolher o modelo mais rápido")
+    parser.add_argument('--report', default=SEARCH_REPORT, help="arquivo do relatório em JSON")
+    args = parser.parse_args()
+
+    search_report = search(args.dataset, n_iter=args.random, folds=args.folds, n_jobs=args.jobs)
+    choice = save_report(search_report, args.accuracy_budget, args.report)['fastest_within_budget']
+    print(f"{len(search_report)} configurações avaliadas; relatório salvo em {args.report}")
+    print(f"Mais rápida dentro da margem: {choice['params']} "
+          f"(acurácia {choice['cv_accuracy']:.4f}, {choice['predict_latency_ms_per_doc']:.4f} ms/doc)")
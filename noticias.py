@@ -1,90 +1,227 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import threading
+import argparse
+import os
+import re
+from crawl_state import CrawlState
+from keyword_filter import KEYWORDS, get_keyword_matcher
+import instrumentation
+import storage
+
+#Configurações do motor de busca concorrente
+MAX_WORKERS = 8  #Limite global de requisições simultâneas
+MAX_PER_HOST = 2  #Limite de requisições simultâneas por host
+PREFETCH_PAGES = 3  #Quantidade de páginas buscadas antecipadamente na paginação
+REQUEST_TIMEOUT = (5, 20)  #Tempo limite de conexão e de leitura, em segundos
+MAX_RETRIES = 3  #Número de novas tentativas para falhas temporárias
+BACKOFF_FACTOR = 0.5  #Espera entre tentativas: 0.5s, 1s, 2s...
+
+#Backends de parsing do BeautifulSoup em ordem de preferência: lxml (em C) e o html.parser puro Python
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+#Escolhe o primeiro backend instalado
+def default_parser():
+    for backend in PARSER_BACKENDS:
+        if builder_registry.lookup(backend) is not None:
+            return backend
+    return 'html.parser'
+
+HTML_PARSER = default_parser()
+
+#Cria uma sessão HTTP que reaproveita conexões keep-alive e repete requisições com backoff
+def create_session(pool_size=MAX_WORKERS):
+    session = requests.Session()
+    retry = Retry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                  status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(['GET']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+#Executa requisições GET em paralelo respeitando um limite global e um limite por host
+class ConcurrentFetcher:
+    def __init__(self, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, timeout=REQUEST_TIMEOUT, session=None):
+        self.session = session or create_session(max_workers)
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)  #O tamanho do pool é o limite global
+        self.host_limits = {}
+        self.lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self.host_limits[host]
+
+    def get(self, url, headers=None):
+        with self._host_limit(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()  #Verifica se a requisição foi bem-sucedida
+        instrumentation.count('paginas_buscadas')
+        instrumentation.count('bytes_baixados', len(response.content))
+        if response.status_code == 304:
+            instrumentation.count('paginas_nao_modificadas')
+        return response
+
+    def submit(self, url, headers=None):
+        return self.executor.submit(self.get, url, headers)  #Agenda a requisição e retorna um Future
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+#Extrai os links de notícias de uma página HTML
+#Apenas as tags de manchete são montadas na árvore (SoupStrainer); o restante da página é descartado
+def parse_news_items(html, headline_tag, link_tag, class_name=None, parser=None):
+    soup = BeautifulSoup(html, parser or HTML_PARSER, parse_only=SoupStrainer(headline_tag))  #Parsea o HTML usando BeautifulSoup
+    #Encontra todas as tags especificadas que contêm links e extrai esses links
+    news_items = [(tag, a) for tag in soup.find_all(headline_tag) for a in tag.find_all(link_tag, href=True)]
+    if class_name:
+        #class_name indica a classe da manchete ou do link; se nenhum elemento a tiver, usa todos os links
+        with_class = [(tag, a) for tag, a in news_items
+                      if class_name in tag.get('class', ()) or class_name in a.get('class', ())]
+        news_items = with_class or news_items
+    #Reduz cada link ao par (título, endereço)
+    entries = [(item.get_text(strip=True), item['href']) for tag, item in news_items]
+    instrumentation.count('itens_extraidos', len(entries))
+    return entries
+
+#Verifica no HTML bruto se há link para a próxima página, sem precisar montar a árvore inteira
+def has_next_page(html, next_href):
+    return re.search(r'href=["\']' + re.escape(next_href) + r'["\']', html) is not None
+
+#Filtra as notícias com base em palavras-chave no título, ignorando títulos já vistos
+def filter_news_items(entries, seen_titles, source, log_prefix='', state=None, matcher=None):
+    matcher = matcher or get_keyword_matcher()
+    news_data = []
+    for title, link in entries:
+        if title not in seen_titles:  #Verifica se o título ainda não foi visto
+            seen_titles.add(title)
+            if state is not None and state.is_seen(link, title):
+                continue  #Notícia já registrada em uma execução anterior
+            #Filtra as notícias com base em palavras-chave no título
+            keywords = matcher.match(title)
+            if keywords:
+                news_data.append({'title': title, 'link': link, 'source': source, 'keywords': keywords})
+                print(f"{log_prefix}Added news: {title}")  #Informação de depuração para cada notícia adicionada
+    instrumentation.count('itens_filtrados', len(news_data))
+    return news_data
+
+#Monta os cabeçalhos condicionais da URL a partir do estado salvo
+def conditional_headers(state, url):
+    return state.conditional_headers(url) if state is not None else None
+
+#Registra os validadores HTTP e as notícias de uma página já processada
+def remember_page(state, url, response, entries):
+    if state is not None:
+        state.mark_seen(entries)
+        state.remember_response(url, response)
 
 #Define uma função para buscar notícias de uma URL específica com manuseio de paginação para Agência Brasil
-def fetch_news(url, headline_tag, link_tag, class_name, max_pages=10):
+#Com um CrawlState, usa requisições condicionais e ignora notícias vistas em execuções anteriores
+#Aceita uma lista própria de palavras-chave por site; sem ela usa KEYWORDS
+def fetch_news(url, headline_tag, link_tag, class_name, max_pages=10, fetcher=None, state=None, keywords=None):
+    if fetcher is None:
+        with ConcurrentFetcher() as own_fetcher:
+            return fetch_news(url, headline_tag, link_tag, class_name, max_pages, own_fetcher, state, keywords)
+
+    matcher = get_keyword_matcher(tuple(keywords) if keywords else KEYWORDS)
     news_data = []
     seen_titles = set()  #Para rastrear os títulos vistos e evitar duplicatas
 
     #Verifica se a URL é do site Agência Brasil
     if 'agenciabrasil.ebc.com.br' in url:
-        #Loop para manusear a paginação até o número máximo de páginas especificado
-        for page in range(1, max_pages + 1):
-            paginated_url = f"{url}?page={page}"  #Constrói a URL da página paginada
-            try:
-                response = requests.get(paginated_url)  #Faz uma requisição GET para a URL paginada
-                response.raise_for_status()  #Verifica se a requisição foi bem-sucedida
-                soup = BeautifulSoup(response.text, 'html.parser')  #Parsea o HTML usando BeautifulSoup
-
-                #Encontra todas as tags especificadas que contêm links e extrai esses links
-                news_items = [a for tag in soup.find_all(headline_tag) for a in tag.find_all(link_tag, href=True)]
-                print(f"Page {page} - Found {len(news_items)} items")  #Informação de depuração
-
-                for item in news_items:
-                    title = item.get_text(strip=True)
-                    if title not in seen_titles:  #Verifica se o título ainda não foi visto
-                        seen_titles.add(title)
-                        #Filtra as notícias com base em palavras-chave no título
-                        keywords = [
-                            'meio ambiente', 'sustentabilidade', 'ecologia', 'natureza', 'poluição', 'enchente', 'chuvas',
-                            'alagamento', 'queimadas', 'queimada', 'animais', 'desmatamento', 'clima',
-                            'mudanças climáticas', 'fauna', 'flora', 'reflorestamento', 'reciclagem',
-                            'biodiversidade', 'aquecimento global', 'impacto', 'ambiental', 'temperatura',
-                            'temperaturas', 'frente fria', 'inundações', 'temporais', 'temporal', 'catástrofe',
-                            'catástrofes', 'alerta', 'seca', 'secas', 'ecossistema', 'ecossistemas',
-                            'risco', 'riscos', 'cheia', 'cheias'
-                        ]
-                        if any(keyword in title.lower() for keyword in keywords):
-                            news_data.append({'title': title, 'link': item['href'], 'source': paginated_url})
-                            print(f"Page {page} - Added news: {title}")  #Informação de depuração para cada notícia adicionada
-
-                #Verifica se há um botão de próxima página
-                next_page = soup.find('div', class_='item_list container').find('a', {'href': f'/tags/meio-ambiente?page={page+1}'})
-                if not next_page:
-                    break  #Sai do loop se não houver mais páginas
-            except requests.RequestException as e:  #Captura exceções relacionadas a requisições HTTP
-                print(f"Falha em encontrar notícias de: {paginated_url}: {e}")
-                break  #Sai do loop se houver um erro ao buscar a página
+        #Agenda antecipadamente as próximas páginas, mas processa os resultados na ordem original
+        pending = {}
+        next_to_submit = 1
+
+        def prefetch(until):
+            nonlocal next_to_submit
+            while next_to_submit <= min(until, max_pages):
+                page_url = f"{url}?page={next_to_submit}"
+                pending[next_to_submit] = fetcher.submit(page_url, conditional_headers(state, page_url))
+                next_to_submit += 1
+
+        try:
+            #Loop para manusear a paginação até o número máximo de páginas especificado
+            for page in range(1, max_pages + 1):
+                prefetch(page + PREFETCH_PAGES)
+                paginated_url = f"{url}?page={page}"  #Constrói a URL da página paginada
+                try:
+                    response = pending.pop(page).result()  #Aguarda a página já solicitada
+                    if response.status_code == 304:
+                        print(f"Page {page} - Sem alterações desde a última busca")
+                        break  #Página inalterada: as seguintes também já foram vistas
+                    entries = parse_news_items(response.text, headline_tag, link_tag, class_name)
+                    print(f"Page {page} - Found {len(entries)} items")  #Informação de depuração
+                    only_known = state is not None and all(state.is_seen(link, title) for title, link in entries)
+                    news_data.extend(filter_news_items(entries, seen_titles, paginated_url, f"Page {page} - ", state, matcher))
+                    remember_page(state, paginated_url, response, entries)
+
+                    if only_known:
+                        print(f"Page {page} - Apenas notícias já vistas")
+                        break  #As páginas seguintes são mais antigas e também já foram vistas
+
+                    #Verifica se há um botão de próxima página
+                    if not has_next_page(response.text, f'/tags/meio-ambiente?page={page+1}'):
+                        break  #Sai do loop se não houver mais páginas
+                except requests.RequestException as e:  #Captura exceções relacionadas a requisições HTTP
+                    print(f"Falha em encontrar notícias de: {paginated_url}: {e}")
+                    break  #Sai do loop se houver um erro ao buscar a página
+        finally:
+            for future in pending.values():
+                future.cancel()  #Descarta as páginas antecipadas que não serão usadas
 
     else:
         #Lógica para outros sites sem manuseio de paginação
         try:
-            response = requests.get(url)  #Faz uma requisição GET para a URL
-            response.raise_for_status()  #Verifica se a requisição foi bem-sucedida
-            soup = BeautifulSoup(response.text, 'html.parser')  #Parsea o HTML usando BeautifulSoup
-
-            #Encontra todas as tags especificadas que contêm links e extrai esses links
-            news_items = [a for tag in soup.find_all(headline_tag) for a in tag.find_all(link_tag, href=True)]
-            print(f"Achados {len(news_items)} itens")  #Informação de depuração
-
-            for item in news_items:
-                title = item.get_text(strip=True)
-                if title not in seen_titles:  #Verifica se o título ainda não foi visto
-                    seen_titles.add(title)
-                    #Filtra as notícias com base em palavras-chave no título
-                    keywords = [
-                        'meio ambiente', 'sustentabilidade', 'ecologia', 'natureza', 'poluição', 'enchente', 'chuvas',
-                        'alagamento', 'queimadas', 'queimada', 'animais', 'desmatamento', 'clima',
-                        'mudanças climáticas', 'fauna', 'flora', 'reflorestamento', 'reciclagem',
-                        'biodiversidade', 'aquecimento global', 'impacto', 'ambiental', 'temperatura',
-                        'temperaturas', 'frente fria', 'inundações', 'temporais', 'temporal', 'catástrofe',
-                        'catástrofes', 'alerta', 'seca', 'secas', 'ecossistema', 'ecossistemas',
-                        'risco', 'riscos', 'cheia', 'cheias'
-                    ]
-                    if any(keyword in title.lower() for keyword in keywords):
-                        news_data.append({'title': title, 'link': item['href'], 'source': url})
-                        print(f"Added news: {title}")  #Informação de depuração para cada notícia adicionada
+            response = fetcher.submit(url, conditional_headers(state, url)).result()  #Faz uma requisição GET para a URL
+            if response.status_code == 304:
+                print(f"Sem alterações desde a última busca: {url}")
+                return news_data
+            entries = parse_news_items(response.text, headline_tag, link_tag, class_name)
+            print(f"Achados {len(entries)} itens")  #Informação de depuração
+            news_data.extend(filter_news_items(entries, seen_titles, url, state=state, matcher=matcher))
+            remember_page(state, url, response, entries)
         except requests.RequestException as e:  #Captura exceções relacionadas a requisições HTTP
             print(f"Falha em encontrar notícias de: {url}: {e}")
     return news_data
 
-#Define uma função para salvar os dados das notícias em um arquivo JSON
-def save_news_to_json(news_data, filename='json/news_data.json'):
-    with open(filename, 'w', encoding='utf-8') as file:  #Abre ou cria um arquivo JSON para escrita
-        json.dump(news_data, file, ensure_ascii=False, indent=4)  #Escreve os dados no arquivo JSON de forma formatada
+#Busca as notícias de todos os sites em paralelo, preservando a ordem da lista de sites
+def fetch_all_news(websites, fetcher=None, state=None):
+    if fetcher is None:
+        with ConcurrentFetcher() as own_fetcher:
+            return fetch_all_news(websites, own_fetcher, state)
+
+    with ThreadPoolExecutor(max_workers=len(websites) or 1) as site_pool:
+        futures = [site_pool.submit(fetch_news, site['url'], site['headline_tag'], site['link_tag'],
+                                    site['class_name'], fetcher=fetcher, state=state,
+                                    keywords=site.get('keywords')) for site in websites]
+        all_news_data = []  #Inicializa uma lista para armazenar dados de todas as notícias
+        for future in futures:
+            all_news_data.extend(future.result())  #Adiciona os dados das notícias à lista
+    return all_news_data
+
+#Carrega do armazenamento as notícias já salvas, lendo só as colunas pedidas
+def load_saved_news(columns=storage.NEWS_COLUMNS):
+    return storage.read_frame(columns=columns).to_dict('records')
 
 #Lista de websites de onde as notícias serão raspadas, junto com as tags HTML relevantes para localização das notícias
+#Cada site pode definir a chave opcional 'keywords' com palavras-chave próprias
 websites = [
     {'url': 'https://g1.globo.com/meio-ambiente/', 'headline_tag': 'h2', 'link_tag': 'a', 'class_name': 'feed-post-link'},
     {'url': 'https://agenciabrasil.ebc.com.br/tags/meio-ambiente', 'headline_tag': 'h4', 'link_tag': 'a', 'class_name': 'news-item'},
@@ -92,12 +229,37 @@ websites = [
     {'url': 'https://exame.com/noticias-sobre/meio-ambiente/', 'headline_tag': 'h3', 'link_tag': 'a', 'class_name': 'feed-post-link'}
 ]
 
-all_news_data = []  #Inicializa uma lista para armazenar dados de todas as notícias
-for site in websites:
-    news_data = fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name'])  #Busca notícias para cada site
-    all_news_data.extend(news_data)  #Adiciona os dados das notícias à lista
-
-print(all_news_data)  #Imprime os dados coletados de todas as notícias
+#Executa a busca e salva as notícias no armazenamento (storage.py), que guarda o histórico de notícias
+#Retorna só as notícias encontradas nesta execução; o histórico é lido do armazenamento com load_saved_news
+#Com full, o estado é zerado antes da busca: todas as páginas são baixadas e processadas de novo, e os
+#validadores HTTP e as notícias encontradas voltam a ser registrados para as próximas buscas incrementais
+#Com export, grava também o histórico em JSON nesse caminho (o formato do antigo news_data.json)
+def main(full=False, export=None):
+    with CrawlState() as state:
+        if full:
+            state.reset()
+            all_news_data = fetch_all_news(websites, state=state)  #Busca notícias de todos os sites
+            print(all_news_data)  #Imprime os dados coletados de todas as notícias
+            #Reescreve o armazenamento com todas as notícias puxadas
+            storage.remove_store()
+            storage.append_records(all_news_data)
+        else:
+            if not os.path.isdir(storage.NEWS_STORE) and os.path.exists(storage.LEGACY_NEWS_JSON):
+                storage.import_json(storage.LEGACY_NEWS_JSON)  #Leva ao armazenamento as notícias salvas pelas versões anteriores
+            if state.is_empty():
+                #Primeira execução incremental: considera vistas as notícias já salvas
+                state.mark_seen((item['title'], item['link']) for item in load_saved_news(['title', 'link']))
+            all_news_data = fetch_all_news(websites, state=state)  #Busca apenas notícias novas
+            print(all_news_data)  #Imprime os dados coletados de todas as notícias
+            storage.append_records(all_news_data)  #Acrescenta as notícias novas ao armazenamento particionado
+    if export:
+        storage.export_json(storage.NEWS_STORE, export)
+    return all_news_data
 
-#Salva todas as notícias puxadas no arquivo: news_data.json
-save_news_to_json(all_news_data)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca notícias ambientais nos sites configurados.")
+    parser.add_argument('--full', action='store_true',
+                        help="zera o estado salvo, busca todas as páginas e reescreve o armazenamento")
+    parser.add_argument('--export', metavar='ARQUIVO', help="exporta as notícias salvas em JSON (ex.: json/news_data.json)")
+    args = parser.parse_args()
+    main(full=args.full, export=args.export)
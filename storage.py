@@ -0,0 +1,218 @@
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+import glob  # Importa a biblioteca glob para localizar os arquivos de cada partição
+import json  # Importa a biblioteca json para o formato JSON Lines e a exportação em JSON
+import os  # Importa a biblioteca os para manipular caminhos de arquivos
+import shutil  # Importa a biblioteca shutil para apagar o armazenamento
+import time  # Importa a biblioteca time para ordenar os arquivos acrescentados
+import uuid  # Importa a biblioteca uuid para nomear os arquivos acrescentados
+from datetime import date  # Importa date para particionar as notícias pelo dia da busca
+from urllib.parse import urlsplit  # Importa função para extrair o host de uma URL
+import pandas as pd  # Importa a biblioteca pandas para manipulação de dados
+
+try:  # O pyarrow é opcional: sem ele, o armazenamento usa JSON Lines
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+# Diretório padrão do armazenamento de notícias, particionado em day=AAAA-MM-DD/host=<site>/
+NEWS_STORE = 'json/news_store'
+# Histórico das notícias buscadas já classificadas (título, previsão, origem e grupo), particionado da mesma forma
+PREDICTIONS_STORE = 'json/predictions_store'
+# Formato padrão: Parquet (colunar, comprimido) quando o pyarrow está instalado
+DEFAULT_FORMAT = 'parquet' if pq is not None else 'jsonl'
+# Arquivo JSON em que as versões anteriores guardavam as notícias; é importado para o armazenamento uma vez
+LEGACY_NEWS_JSON = 'json/news_data.json'
+# Colunas das notícias usadas pela classificação (as demais ficam no armazenamento, mas não são lidas)
+NEWS_COLUMNS = ['title', 'link', 'source']
+# Colunas das partições, recuperadas a partir dos nomes dos diretórios
+PARTITION_COLUMNS = ('day', 'host')
+
+
+# Função para obter o host usado como partição a partir da URL de origem da notícia
+def source_host(url):
+    return urlsplit(url or '').netloc or 'desconhecido'
+
+
+# Função para obter o diretório de uma partição
+def partition_dir(root, day, host):
+    return os.path.join(root, f'day={day}', f'host={host}')
+
+
+# Função para nomear um novo arquivo Parquet da partição; o prefixo de tempo mantém os arquivos, e portanto
+# as notícias, na ordem em que foram acrescentados
+def part_name():
+    return f'part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet'
+
+
+# Função para acrescentar notícias ao armazenamento; cada chamada cria novos arquivos, sem reescrever os antigos
+def append_records(records, root=NEWS_STORE, fmt=DEFAULT_FORMAT, day=None):
+    day = day or date.today().isoformat()
+    groups = {}
+    for record in records:  # Agrupa as notícias por partição
+        groups.setdefault(source_host(record.get('source')), []).append(record)
+    for host, rows in groups.items():
+        directory = partition_dir(root, day, host)
+        os.makedirs(directory, exist_ok=True)
+        if fmt == 'parquet':
+            if pq is None:
+                raise RuntimeError("O formato Parquet precisa do pacote pyarrow")
+            table = pa.Table.from_pylist(rows)
+            pq.write_table(table, os.path.join(directory, part_name()), compression='zstd')
+        elif fmt == 'jsonl':
+            with open(os.path.join(directory, 'part.jsonl'), 'a', encoding='utf-8') as file:
+                file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        else:
+            raise ValueError(f"Formato desconhecido: {fmt}")
+
+
+# Função para apagar o armazenamento inteiro (usada quando todas as notícias são buscadas de novo)
+def remove_store(root=NEWS_STORE):
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+
+
+# Função para listar os arquivos de um formato nas partições selecionadas
+def partition_files(root, extension, days=None, hosts=None):
+    files = []
+    for path in sorted(glob.glob(os.path.join(root, 'day=*', 'host=*', f'*.{extension}'))):
+        day = os.path.basename(os.path.dirname(os.path.dirname(path)))[len('day='):]
+        host = os.path.basename(os.path.dirname(path))[len('host='):]
+        if (days is None or day in days) and (hosts is None or host in hosts):
+            files.append((path, day, host))
+    return files
+
+
+# Função para ler as notícias em streaming, linha a linha, dos arquivos JSON Lines
+def iter_records(root=NEWS_STORE, columns=None, days=None, hosts=None):
+    for path, day, host in partition_files(root, 'jsonl', days, hosts):
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                record = {**json.loads(line), 'day': day, 'host': host}
+                yield record if columns is None else {column: record.get(column) for column in columns}
+
+
+# Função para carregar as notícias como DataFrame, lendo só as colunas e as partições pedidas
+def read_frame(root=NEWS_STORE, columns=None, days=None, hosts=None):
+    if root.endswith('.parquet') or root.endswith('.jsonl'):  # Arquivo avulso, fora de um armazenamento particionado
+        frame = pd.read_parquet(root, columns=columns) if root.endswith('.parquet') else pd.read_json(root, lines=True)
+        return frame if columns is None else frame[list(columns)]
+    files = partition_files(root, 'parquet', days, hosts)
+    if files:
+        if pq is None:
+            raise RuntimeError("O formato Parquet precisa do pacote pyarrow")
+        partition_schema = pa.schema([('day', pa.string()), ('host', pa.string())])
+        # Arquivos acrescentados em momentos diferentes podem ter colunas diferentes (ex.: 'keywords'), e arquivos
+        # gravados por outras versões podem usar large_string no lugar de string: o esquema comum aceita os dois
+        schema = pa.unify_schemas([pq.read_schema(path) for path, _, _ in files] + [partition_schema],
+                                  promote_options='permissive')
+        # use_mmap mapeia os arquivos em memória em vez de copiá-los antes de decodificar as colunas
+        dataset = ds.dataset([path for path, _, _ in files], schema=schema, format='parquet',
+                             partitioning=ds.partitioning(partition_schema, flavor='hive'), partition_base_dir=root,
+                             filesystem=pa.fs.LocalFileSystem(use_mmap=True))
+        return dataset.to_table(columns=list(columns) if columns else None).to_pandas()
+    return pd.DataFrame(list(iter_records(root, columns, days, hosts)), columns=columns)
+
+
+# Função para juntar os vários arquivos pequenos criados pelos acréscimos em um arquivo por partição
+def compact(root=NEWS_STORE):
+    partitions = {}
+    for path, day, host in partition_files(root, 'parquet'):
+        partitions.setdefault((day, host), []).append(path)
+    for (day, host), paths in partitions.items():
+        if len(paths) < 2:
+            continue
+        # Lê e grava com o pyarrow, sem passar pelo pandas, para manter os tipos gravados por append_records
+        # (o pandas 3 converteria as colunas de texto para large_string)
+        schema = pa.unify_schemas([pq.read_schema(path) for path in paths], promote_options='permissive')
+        table = ds.dataset(paths, schema=schema, format='parquet').to_table()
+        target = os.path.join(partition_dir(root, day, host), part_name())
+        pq.write_table(table, target, compression='zstd')
+        for path in paths:  # Remove os arquivos antigos só depois de gravar o novo
+            os.remove(path)
+    return len(partitions)
+
+
+# Função para gravar um DataFrame avulso conforme a extensão: .parquet, .jsonl ou JSON formatado
+def write_frame(frame, path):
+    if path.endswith('.parquet'):
+        frame.to_parquet(path, index=False, compression='zstd')
+    elif path.endswith('.jsonl'):
+        frame.to_json(path, orient='records', lines=True, force_ascii=False)
+    else:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(frame.to_dict('records'), file, ensure_ascii=False, indent=4)
+
+
+# Função para obter a versão de um arquivo ou de um armazenamento, que muda sempre que ele é alterado
+# No armazenamento, acréscimos e compactações mudam o arquivo mais recente ou a quantidade de arquivos
+def modified_time(path):
+    if not os.path.isdir(path):
+        return os.stat(path).st_mtime_ns
+    files = glob.glob(os.path.join(path, 'day=*', 'host=*', '*'))
+    return max((os.stat(file).st_mtime_ns for file in files), default=0), len(files)
+
+
+# Função para obter o caminho de um arquivo de saída no formato padrão do armazenamento (ex.: json/dia1news.parquet)
+def output_path(base, fmt=DEFAULT_FORMAT):
+    return f'{base}.{fmt}'
+
+
+# Função para verificar se um caminho aponta para o armazenamento (e não para um arquivo JSON comum)
+def is_store(path):
+    return os.path.isdir(path) or path.endswith('.parquet') or path.endswith('.jsonl')
+
+
+# Função para exportar o armazenamento para o formato JSON usado pelos demais arquivos do projeto
+def export_json(root, json_path, columns=None, days=None, hosts=None):
+    frame = read_frame(root, columns, days, hosts)
+    if columns is None:  # As colunas das partições só são exportadas quando pedidas
+        frame = frame.drop(columns=[column for column in PARTITION_COLUMNS if column in frame])
+    records = []
+    for record in frame.to_dict('records'):
+        # Listas lidas do Parquet chegam como arrays; campos ausentes são omitidos, como nos arquivos originais
+        records.append({key: value.tolist() if hasattr(value, 'tolist') else value
+                        for key, value in record.items() if isinstance(value, (list, str)) or hasattr(value, 'tolist') or not pd.isna(value)})
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(records, file, ensure_ascii=False, indent=4)
+    return len(records)
+
+
+# Função para importar um arquivo JSON existente para o armazenamento
+def import_json(json_path, root=NEWS_STORE, fmt=DEFAULT_FORMAT, day=None):
+    with open(json_path, 'r', encoding='utf-8') as file:
+        records = json.load(file)
+    append_records(records, root, fmt, day)
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Armazenamento das notícias em Parquet ou JSON Lines.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="importa um arquivo JSON para o armazenamento")
+    import_parser.add_argument('json_path')
+    import_parser.add_argument('--store', default=NEWS_STORE)
+    import_parser.add_argument('--format', choices=('parquet', 'jsonl'), default=DEFAULT_FORMAT)
+    import_parser.add_argument('--day', help="dia da partição (AAAA-MM-DD); padrão: hoje")
+
+    export_parser = commands.add_parser('export', help="exporta o armazenamento para um arquivo JSON")
+    export_parser.add_argument('json_path')
+    export_parser.add_argument('--store', default=NEWS_STORE)
+    export_parser.add_argument('--columns', nargs='+')
+    export_parser.add_argument('--days', nargs='+')
+    export_parser.add_argument('--hosts', nargs='+')
+
+    compact_parser = commands.add_parser('compact', help="junta os arquivos Parquet de cada partição")
+    compact_parser.add_argument('--store', default=NEWS_STORE)
+
+    args = parser.parse_args()
+    if args.command == 'compact':
+        print(f"{compact(args.store)} partições verificadas em {args.store}")
+    elif args.command == 'import':
+        print(f"{import_json(args.json_path, args.store, args.format, args.day)} notícias importadas para {args.store}")
+    else:
+        count = export_json(args.store, args.json_path, args.columns, args.days, args.hosts)
+        print(f"{count} notícias exportadas para {args.json_path}")
@@ -1,103 +1,159 @@
 import tkinter as tk  # Importa a biblioteca tkinter para criar interfaces gráficas
-import matplotlib.pyplot as plt  # Importa a biblioteca matplotlib para criação de gráficos
 import json  # Importa a biblioteca json para carregar e salvar dados em formato JSON
+import os  # Importa a biblioteca os para verificar quando um arquivo foi alterado
 import socket  # Importa a biblioteca socket para manipulação de protocolos de rede
+from matplotlib.figure import Figure  # Importa a figura do matplotlib, sem o estado global do pyplot
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # Importa backend do matplotlib para integração com tkinter
+import instrumentation  # Importa os temporizadores e contadores de desempenho
+import storage  # Importa o armazenamento de notícias em Parquet / JSON Lines
+
+PAGE_SIZE = 200  # Quantidade de notícias exibidas por página
+
+# Cache dos arquivos já carregados; um arquivo só é lido de novo quando sua data de modificação muda
+file_cache = {}
+
+# Função para carregar um arquivo (ou o histórico de previsões) usando o cache
+def load_cached(filename, loader):
+    mtime = storage.modified_time(filename)  # Data de modificação do arquivo ou do arquivo mais recente do histórico
+    cached = file_cache.get(filename)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, loader(filename))
+        file_cache[filename] = cached
+    return cached[1]
+
+# Função para ler um arquivo JSON
+def read_json(filename):
+    with open(filename, 'r', encoding='utf-8') as file:  # Garante a codificação UTF-8
+        return json.load(file)  # Carrega os dados do arquivo JSON
+
+# Função para ler as notícias classificadas: lista JSON, {'details': [...]} ou armazenamento Parquet / JSON Lines
+def read_news(filename):
+    if storage.is_store(filename):
+        return storage.read_frame(filename, columns=['title', 'prediction']).to_dict('records')
+    news_data = read_json(filename)
+    if isinstance(news_data, dict):
+        if 'details' not in news_data:  # Verifica se a chave 'details' está presente
+            raise KeyError("Key 'details' not found in the JSON data")
+        news_data = news_data['details']
+    return news_data
+
+# Função para escolher o arquivo de notícias classificadas: o gravado pelo ai_analyzer.py no formato do
+# armazenamento ou, se ele ainda não existir, o JSON exportado
+def news_output(base):
+    path = storage.output_path(base)
+    return path if os.path.exists(path) else base + '.json'
+
+# Função para escolher as notícias buscadas e classificadas: o histórico de previsões ou o JSON exportado
+def predictions_output():
+    return storage.PREDICTIONS_STORE if os.path.isdir(storage.PREDICTIONS_STORE) else 'json/results_prediction.json'
 
 # Função para carregar dados a partir de um arquivo JSON
 def load_data(filename):
-    with open(filename, 'r', encoding='utf-8') as file:  # Garante a codificação UTF-8
-        data = json.load(file)  # Carrega os dados do arquivo JSON
+    data = load_cached(filename, read_json)  # Carrega os dados do arquivo JSON
     labels = list(data.keys())  # Extrai as chaves do JSON como labels
     sizes = [float(result[:-1]) for result in data.values()]  # Converte os valores do JSON em tamanhos de fatia
     return labels, sizes  # Retorna labels e tamanhos
 
+# Janela que exibe as notícias em páginas: só as notícias da página atual são inseridas no widget de texto
+class NewsViewer:
+    def __init__(self, news_filename, title_label='Title', prediction_label='Prediction',
+                 prediction_default='No prediction available'):
+        self.title_label = title_label
+        self.prediction_label = prediction_label
+        self.prediction_default = prediction_default
+        self.page = 0
+        self.window = tk.Toplevel(window)  # Cria uma nova janela
+        self.window.title(f"Novos detalhes para: {news_filename}")  # Define o título da nova janela
+        self.text_widget = tk.Text(self.window, wrap='word', height=20, width=80)  # Cria um widget de texto
+        navigation = tk.Frame(self.window)
+        self.previous_btn = tk.Button(navigation, text="< Anterior", command=lambda: self.go_to(self.page - 1))
+        self.page_label = tk.Label(navigation)
+        self.next_btn = tk.Button(navigation, text="Próxima >", command=lambda: self.go_to(self.page + 1))
+        self.previous_btn.pack(side=tk.LEFT)
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        self.next_btn.pack(side=tk.LEFT)
+        try:
+            self.articles = load_cached(news_filename, read_news)  # Carrega as notícias (do cache, se possível)
+            self.error = None
+        except Exception as e:
+            self.articles = []
+            self.error = f"Falha em carregar as notícias parseadas: {e}\n"  # Mensagem de erro se a leitura falhar
+        self.text_widget.pack()  # Adiciona o widget de texto à janela
+        navigation.pack(pady=5)
+        self.render()
+
+    def page_count(self):
+        return max(1, -(-len(self.articles) // PAGE_SIZE))
+
+    def go_to(self, page):
+        self.page = min(max(page, 0), self.page_count() - 1)
+        self.render()
+
+    # Monta o texto da página atual e o insere de uma só vez
+    def render(self):
+        start = self.page * PAGE_SIZE
+        lines = [f"{self.title_label}: {article.get('title', 'Sem títulos disponíveis')}\n"
+                 f"{self.prediction_label}: {article.get('prediction', self.prediction_default)}\n\n"
+                 for article in self.articles[start:start + PAGE_SIZE]]
+        self.text_widget.config(state='normal')
+        self.text_widget.delete('1.0', tk.END)
+        self.text_widget.insert(tk.END, self.error or ''.join(lines))  # Insere os artigos no widget de texto
+        self.text_widget.config(state='disabled')  # Desabilita o widget de texto para edição
+        self.page_label.config(text=f"Página {self.page + 1} de {self.page_count()} ({len(self.articles)} notícias)")
+        self.previous_btn.config(state='normal' if self.page > 0 else 'disabled')
+        self.next_btn.config(state='normal' if self.page < self.page_count() - 1 else 'disabled')
+
 # Função para exibir notícias do arquivo de resultado
 def display_result_news(news_filename):
-    news_window = tk.Toplevel(window)  # Cria uma nova janela
-    news_window.title(f"Novos detalhes para: {news_filename}")  # Define o título da nova janela
-    text_widget = tk.Text(news_window, wrap='word', height=20, width=80)  # Cria um widget de texto
-    try:
-        with open(news_filename, 'r', encoding='utf-8') as file:  # Garante a codificação UTF-8
-            news_data = json.load(file)  # Carrega os dados do arquivo JSON
-        if 'details' in news_data:  # Verifica se a chave 'details' está presente
-            for article in news_data['details']:  # Itera sobre os artigos em 'details'
-                title = article.get('title', 'Sem títulos disponíveis')  # Obtém o título do artigo
-                prediction = article.get('prediction', 'Indisponível')  # Obtém a previsão do artigo
-                text_widget.insert(tk.END, f"Título: {title}\nPrevisão: {prediction}\n\n")  # Insere o artigo no widget de texto
-        else:
-            text_widget.insert(tk.END, f"Key 'details' not found in the JSON data\n")  # Mensagem de erro se 'details' não estiver presente
-    except Exception as e:
-        text_widget.insert(tk.END, f"Falha em carregar as notícias parseadas: {e}\n")  # Mensagem de erro se a leitura falhar
-    text_widget.config(state='disabled')  # Desabilita o widget de texto para edição
-    text_widget.pack()  # Adiciona o widget de texto à janela
+    return NewsViewer(news_filename, 'Título', 'Previsão', 'Indisponível')
 
 # Função para exibir notícias do arquivo de notícias
 def display_news(news_filename):
-    news_window = tk.Toplevel(window)  # Cria uma nova janela
-    news_window.title(f"Novos detalhes para: {news_filename}")  # Define o título da nova janela
-    text_widget = tk.Text(news_window, wrap='word', height=20, width=80)  # Cria um widget de texto
-    try:
-        with open(news_filename, 'r', encoding='utf-8') as file:  # Garante a codificação UTF-8
-            news_data = json.load(file)  # Carrega os dados do arquivo JSON
-        for article in news_data:  # Itera sobre os artigos no JSON
-            title = article.get('title', 'Sem títulos disponíveis')  # Obtém o título do artigo
-            prediction = article.get('prediction', 'No prediction available')  # Obtém a previsão do artigo
-            text_widget.insert(tk.END, f"Title: {title}\nPrediction: {prediction}\n\n")  # Insere o artigo no widget de texto
-    except Exception as e:
-        text_widget.insert(tk.END, f"Falha em carregar as notícias parseadas: {e}\n")  # Mensagem de erro se a leitura falhar
-    text_widget.config(state='disabled')  # Desabilita o widget de texto para edição
-    text_widget.pack()  # Adiciona o widget de texto à janela
-
-# Função para exibir notícias do arquivo results_prediction.json
-def display_general_news(news_filename='json/results_prediction.json'):
-    news_window = tk.Toplevel(window)  # Cria uma nova janela
-    news_window.title(f"Novos detalhes para: {news_filename}")  # Define o título da nova janela
-    text_widget = tk.Text(news_window, wrap='word', height=20, width=80)  # Cria um widget de texto
-    try:
-        with open(news_filename, 'r', encoding='utf-8') as file:  # Garante a codificação UTF-8
-            news_data = json.load(file)  # Carrega os dados do arquivo JSON
-        for article in news_data:  # Itera sobre os artigos no JSON
-            title = article.get('title', 'Sem títulos disponíveis')  # Obtém o título do artigo
-            prediction = article.get('prediction', 'No prediction available')  # Obtém a previsão do artigo
-            text_widget.insert(tk.END, f"Title: {title}\nPrediction: {prediction}\n\n")  # Insere o artigo no widget de texto
-    except Exception as e:
-        text_widget.insert(tk.END, f"Falha em carregar as notícias parseadas: {e}\n")  # Mensagem de erro se a leitura falhar
-    text_widget.config(state='disabled')  # Desabilita o widget de texto para edição
-    text_widget.pack()  # Adiciona o widget de texto à janela
-
-# Função para criar um gráfico de pizza
-def create_pie_chart(labels, sizes, title):
-    fig, ax = plt.subplots()  # Cria uma figura e um eixo
-    ax.pie(sizes, labels=labels, autopct='%1.1f%%', shadow=True, startangle=90)  # Cria o gráfico de pizza
-    ax.axis('equal')  # Garante que o gráfico de pizza seja desenhado como um círculo
-    plt.title(title)  # Define o título do gráfico
+    return NewsViewer(news_filename)
+
+# Função para exibir as notícias buscadas e classificadas (results_prediction)
+def display_general_news(news_filename=None):
+    return NewsViewer(news_filename or predictions_output())
+
+# Função para criar um gráfico de pizza; com fig, redesenha a figura existente em vez de criar outra
+def create_pie_chart(labels, sizes, title, fig=None):
+    with instrumentation.stage('gráfico'):
+        if fig is None:
+            fig = Figure()  # Cria uma figura
+        fig.clear()
+        ax = fig.add_subplot()  # Cria um eixo
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', shadow=True, startangle=90)  # Cria o gráfico de pizza
+        ax.axis('equal')  # Garante que o gráfico de pizza seja desenhado como um círculo
+        ax.set_title(title)  # Define o título do gráfico
     return fig  # Retorna a figura
 
+# Painel com o gráfico e o botão de notícias, criado uma única vez e reaproveitado a cada clique
+class ChartPanel:
+    def __init__(self, canvas_container):
+        self.figure = Figure()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=canvas_container)  # Cria um canvas para o gráfico
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)  # Adiciona o canvas ao contêiner
+        self.news_btn = tk.Button(canvas_container, text="Mostrar notícias")  # Cria um sub-botão para notícias
+        self.news_btn.pack(side=tk.BOTTOM, pady=5)  # Adiciona o botão ao contêiner
+
+    def show(self, filename, news_file):
+        labels, sizes = load_data(filename)  # Carrega os dados do arquivo
+        create_pie_chart(labels, sizes, "Analysis Results", self.figure)  # Redesenha o gráfico de pizza
+        self.canvas.draw_idle()  # Atualiza o canvas sem recriá-lo
+        if 'dia' in filename:
+            self.news_btn.config(command=lambda: display_news(news_file))
+        else:
+            self.news_btn.config(command=lambda: display_general_news(news_file))
+
 # Função para lidar com o clique no botão para mostrar resultados
 def show_results(filename, canvas_container, news_file=None):
-    # Limpa o gráfico anterior e fecha a figura anterior para evitar vazamento de memória
-    for widget in canvas_container.winfo_children():
-        widget.destroy()
-    plt.close('all')  # Fecha todas as figuras para liberar memória
-
-    labels, sizes = load_data(filename)  # Carrega os dados do arquivo
-    fig = create_pie_chart(labels, sizes, "Analysis Results")  # Cria o gráfico de pizza
-    canvas = FigureCanvasTkAgg(fig, master=canvas_container)  # Cria um canvas para o gráfico
-    canvas.draw()  # Desenha o gráfico no canvas
-    canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)  # Adiciona o canvas ao contêiner
-
     # Determina qual arquivo usar para exibir as notícias
     if not news_file:
         news_file = filename.replace('result', 'news')  # Substitui 'result' por 'news' no nome do arquivo
-
-    # Cria um sub-botão para notícias
-    if 'dia' in filename:
-        news_btn = tk.Button(canvas_container, text="Mostrar notícias", command=lambda: display_news(news_file))
-    else:
-        news_btn = tk.Button(canvas_container, text="Mostrar notícias", command=lambda: display_general_news())
-
-    news_btn.pack(side=tk.BOTTOM, pady=5)  # Adiciona o botão ao contêiner
+    # O painel é criado no primeiro clique e depois apenas atualizado
+    if not hasattr(canvas_container, 'chart_panel'):
+        canvas_container.chart_panel = ChartPanel(canvas_container)
+    canvas_container.chart_panel.show(filename, news_file)
 
 # Função para exibir protocolo de rede
 def display_network_protocol():
@@ -129,30 +185,39 @@ def display_network_protocol():
     text_widget.config(state='disabled')  # Desabilita o widget de texto para edição
     text_widget.pack()  # Adiciona o widget de texto à janela
 
-# Cria a janela principal
-window = tk.Tk()
-window.title("Resultados")  # Define o título da janela
+# Janela principal, criada por run_gui
+window = None
+
+# Função para montar e exibir a interface com os resultados
+def run_gui():
+    global window
+    # Cria a janela principal
+    window = tk.Tk()
+    window.title("Resultados")  # Define o título da janela
+
+    # Frame para botões
+    button_frame = tk.Frame(window)
+    button_frame.pack(side=tk.LEFT, fill=tk.Y)  # Posiciona o frame à esquerda
 
-# Frame para botões
-button_frame = tk.Frame(window)
-button_frame.pack(side=tk.LEFT, fill=tk.Y)  # Posiciona o frame à esquerda
+    # Frame para canvas
+    canvas_frame = tk.Frame(window)
+    canvas_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)  # Posiciona o frame à direita
 
-# Frame para canvas
-canvas_frame = tk.Frame(window)
-canvas_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)  # Posiciona o frame à direita
+    # Gera botões dinamicamente com base nos nomes dos arquivos
+    file_names = [f"json/dia{i}result.json" for i in range(1, 6)] + ['json/results.json']
+    button_labels = [f"Dia {i}" for i in range(1, 6)] + ["Resultados Gerais"]
+    news_files = [news_output(f"json/dia{i}news") for i in range(1, 6)] + [predictions_output()]  # Arquivo de notícias específico para "Resultados Gerais"
 
-# Gera botões dinamicamente com base nos nomes dos arquivos
-file_names = [f"json/dia{i}result.json" for i in range(1, 6)] + ['json/results.json']
-button_labels = [f"Dia {i}" for i in range(1, 6)] + ["Resultados Gerais"]
-news_files = [f"json/dia{i}news.json" for i in range(1, 6)] + ['json/results_prediction.json']  # Arquivo de notícias específico para "Resultados Gerais"
+    for file_name, label, news_file in zip(file_names, button_labels, news_files):
+        btn = tk.Button(button_frame, text=label,
+                        command=lambda f=file_name, c=canvas_frame, n=news_file: show_results(f, c, n))
+        btn.pack(side=tk.TOP, padx=10, pady=10)  # Adiciona o botão ao frame
 
-for file_name, label, news_file in zip(file_names, button_labels, news_files):
-    btn = tk.Button(button_frame, text=label,
-                    command=lambda f=file_name, c=canvas_frame, n=news_file: show_results(f, c, n))
-    btn.pack(side=tk.TOP, padx=10, pady=10)  # Adiciona o botão ao frame
+    # Adiciona botão para exibir protocolo de rede
+    network_btn = tk.Button(button_frame, text="Mostrar Protocolo de Rede", command=display_network_protocol)
+    network_btn.pack(side=tk.TOP, padx=10, pady=10)  # Adiciona o botão ao frame
 
-# Adiciona botão para exibir protocolo de rede
-network_btn = tk.Button(button_frame, text="Mostrar Protocolo de Rede", command=display_network_protocol)
-network_btn.pack(side=tk.TOP, padx=10, pady=10)  # Adiciona o botão ao frame
+    window.mainloop()  # Inicia o loop principal da aplicação
 
-window.mainloop()  # Inicia o loop principal da aplicação
+if __name__ == "__main__":
+    run_gui()
@@ -0,0 +1,46 @@
+import json
+import os
+import random
+import sys
+import pytest
+
+#Os módulos do projeto ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stand_in import StandIn
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    yield server
+    server.close()
+
+
+#Palavras das manchetes sintéticas rotuladas: cada rótulo tem o seu vocabulário, mais palavras comuns aos dois
+GOOD_WORDS = ['reflorestamento', 'recupera', 'preservação', 'reciclagem', 'avança', 'proteção', 'nascentes',
+              'energia', 'solar', 'restauração', 'recorde', 'plantio', 'mudas', 'espécies', 'retorno', 'limpa']
+BAD_WORDS = ['desmatamento', 'queimadas', 'enchente', 'destrói', 'poluição', 'seca', 'mortes', 'alerta',
+             'incêndio', 'contamina', 'vazamento', 'óleo', 'perda', 'crise', 'temporal', 'desabrigados']
+COMMON_WORDS = ['governo', 'região', 'cidade', 'estado', 'sul', 'norte', 'semana', 'relatório', 'estudo', 'país',
+                'rio', 'floresta', 'amazônia', 'moradores', 'prefeitura', 'brasil', 'litoral', 'cerrado']
+
+
+#Notícias rotuladas sintéticas ('good' e 'bad' alternados), no formato de json/news_data_train.json
+def labelled_records(count, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        label = 'good' if i % 2 == 0 else 'bad'
+        words = rng.sample(GOOD_WORDS if label == 'good' else BAD_WORDS, 4) + rng.sample(COMMON_WORDS, 4)
+        rng.shuffle(words)
+        records.append({'title': ' '.join(words[:5]).capitalize(), 'introducao': ' '.join(words[5:]), 'label': label})
+    return records
+
+
+@pytest.fixture
+def labelled_dataset(tmp_path):
+    path = tmp_path / 'news_data_train.json'
+    path.write_text(json.dumps(labelled_records(120), ensure_ascii=False), encoding='utf-8')
+    return str(path)
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+#Servidor HTTP local que imita os layouts dos quatro sites da lista websites
+#Cada site é servido em /<host do site><caminho original>, ex.: /g1.globo.com/meio-ambiente/
+
+AGENCIA_PAGES = 4  #Quantidade de páginas da paginação da Agência Brasil
+
+G1_TITLES = ['Chuvas deixam cidades em alerta no Sul', 'Seleção vence amistoso', 'Desmatamento cresce na Amazônia',
+             'Chuvas deixam cidades em alerta no Sul', 'Reciclagem de plástico bate recorde']
+BBC_TITLES = ['Como o aquecimento global afeta os oceanos', 'Eleições nos EUA', 'A fauna ameaçada do Cerrado']
+EXAME_TITLES = ['Empresas investem em sustentabilidade', 'Bolsa fecha em alta', 'Queimadas no Pantanal batem recorde']
+
+
+def agencia_titles(page):
+    return [f'Temporal atinge capital {page}-{i}' if i % 2 == 0 else f'Campeonato rodada {page}-{i}' for i in range(4)]
+
+
+#g1: manchete em <h2> com o link de classe feed-post-link
+def g1_page():
+    items = ''.join(f'<div class="feed-post-body"><h2><a href="/g1/{i}" class="feed-post-link gui-color-primary">{title}</a></h2>'
+                    f'<span class="feed-post-metadata">Há 2 horas</span></div>' for i, title in enumerate(G1_TITLES))
+    return f'<html><body><nav><a href="/menu">Menu</a></nav><div class="feed">{items}</div></body></html>'
+
+
+#Agência Brasil: manchete em <h4>, paginação por /tags/meio-ambiente?page=N
+def agencia_page(page):
+    items = ''.join(f'<div class="post-item"><h4 class="titulo"><a href="/ab/{page}/{i}">{title}</a></h4></div>'
+                    for i, title in enumerate(agencia_titles(page)))
+    next_link = f'<a href="/tags/meio-ambiente?page={page + 1}">Próxima</a>' if page < AGENCIA_PAGES else ''
+    return f'<html><body><div class="item_list container">{items}{next_link}</div></body></html>'
+
+
+#BBC: manchete em <h2>, link sem a classe configurada (usa o fallback de class_name)
+def bbc_page():
+    items = ''.join(f'<li><div class="promo"><h2 class="bbc-title"><a class="focusIndicator" href="/bbc/{i}">{title}</a>'
+                    f'</h2></div></li>' for i, title in enumerate(BBC_TITLES))
+    return f'<html><body><ul>{items}</ul></body></html>'
+
+
+#Exame: manchete em <h3> com o link envolvendo o texto
+def exame_page():
+    items = ''.join(f'<div class="card"><h3><a href="/exame/{i}"><span>{title}</span></a></h3></div>'
+                    for i, title in enumerate(EXAME_TITLES))
+    return f'<html><body>{items}<footer><h3>Newsletter</h3></footer></body></html>'
+
+
+def default_page(path, query):
+    host = path.strip('/').split('/')[0]
+    if host == 'agenciabrasil.ebc.com.br':
+        match = re.search(r'page=(\d+)', query)
+        page = int(match.group(1)) if match else 1
+        return agencia_page(page) if page <= AGENCIA_PAGES else None
+    return {'g1.globo.com': g1_page, 'www.bbc.com': bbc_page, 'exame.com': exame_page}.get(host, lambda: None)()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            failures = server.failures.get(self.path, 0)
+            if failures:
+                server.failures[self.path] = failures - 1
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            if failures:
+                self.respond(503, b'')
+                return
+            parts = urlsplit(self.path)
+            html = server.pages.get(self.path)
+            if html is None:
+                html = default_page(parts.path, parts.query)
+            if html is None:
+                self.respond(404, b'')
+                return
+            body = html.encode('utf-8')
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if server.etags and self.headers.get('If-None-Match') == etag:
+                server.not_modified.append(self.path)
+                self.respond(304, b'', etag)
+                return
+            self.respond(200, body, etag if server.etags else None)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def respond(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  #Clientes que desistem por timeout fecham a conexão antes da resposta
+
+
+#Inicia o servidor em uma porta livre; pages substitui o HTML de um caminho, failures responde 503 n vezes
+class StandIn:
+    def __init__(self):
+        self.server = StandInServer(('127.0.0.1', 0), StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.not_modified = []
+        self.server.pages = {}
+        self.server.failures = {}
+        self.server.delay = 0
+        self.server.etags = False
+        self.server.active = 0
+        self.server.max_active = 0
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    #Lista websites apontando para o servidor local
+    def websites(self, websites):
+        sites = []
+        for site in websites:
+            parts = urlsplit(site['url'])
+            sites.append({**site, 'url': f'{self.base}/{parts.netloc}{parts.path}'})
+        return sites
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,284 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import pytest
+import numpy as np
+import pandas as pd
+import ai_analyzer
+import storage
+from conftest import labelled_records
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ConstantModel:
+    def predict(self, texts):
+        return np.zeros(len(texts), dtype=int)
+
+
+#Classifica como ruim (1) todo texto com "seca" e guarda os textos recebidos em cada chamada
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, texts):
+        self.calls.append(list(texts))
+        return np.array([1 if 'seca' in text else 0 for text in texts])
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    #classify_all usa os caminhos padrão em json/, relativos ao diretório atual
+    (tmp_path / 'json').mkdir()
+    for i in range(1, 6):
+        shutil.copy(os.path.join(ROOT, 'json', f'dia{i}.json'), tmp_path / 'json')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def test_cold_start_is_recorded_at_first_prediction(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(ai_analyzer, 'record_cold_start', lambda **details: recorded.append(details))
+    monkeypatch.setattr(ai_analyzer, 'pending_cold_start', {'model': 'abc', 'source': 'cache'})
+    labels = ai_analyzer.predict_labels(ConstantModel(), pd.Series(['Enchentes no RS', 'Enchentes no RS']))
+    assert list(labels) == ['good', 'good']
+    ai_analyzer.predict_labels(ConstantModel(), pd.Series(['Seca no Nordeste']))
+    assert recorded == [{'model': 'abc', 'source': 'cache'}]
+
+
+def test_no_cold_start_without_load_model(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(ai_analyzer, 'record_cold_start', lambda **details: recorded.append(details))
+    monkeypatch.setattr(ai_analyzer, 'pending_cold_start', None)
+    ai_analyzer.predict_labels(ConstantModel(), pd.Series(['Seca no Nordeste']))
+    assert recorded == []
+
+
+@pytest.fixture
+def training_calls(monkeypatch):
+    calls = []
+    original = ai_analyzer.train_and_evaluate
+
+    def counting_train(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(ai_analyzer, 'train_and_evaluate', counting_train)
+    return calls
+
+
+SMALL_PARAMS = {**ai_analyzer.HYPERPARAMS, 'n_components': 5}
+
+
+def test_unchanged_fingerprint_loads_saved_model(labelled_dataset, tmp_path, training_calls):
+    model_dir = str(tmp_path / 'models')
+    trained = ai_analyzer.load_or_train_model(labelled_dataset, SMALL_PARAMS, model_dir)
+    loaded = ai_analyzer.load_or_train_model(labelled_dataset, SMALL_PARAMS, model_dir)
+    assert len(training_calls) == 1
+    texts = pd.Series(['reflorestamento recupera nascentes', 'queimadas destroem floresta'])
+    assert list(loaded.predict(texts)) == list(trained.predict(texts))
+
+
+@pytest.mark.parametrize('change', ['dataset', 'params', 'pipeline'])
+def test_changes_trigger_retrain(labelled_dataset, tmp_path, training_calls, monkeypatch, change):
+    model_dir = str(tmp_path / 'models')
+    ai_analyzer.load_or_train_model(labelled_dataset, SMALL_PARAMS, model_dir)
+    params = SMALL_PARAMS
+    if change == 'dataset':
+        records = json.loads(open(labelled_dataset, encoding='utf-8').read())
+        with open(labelled_dataset, 'w', encoding='utf-8') as file:
+            json.dump(records[:-2], file)
+    elif change == 'params':
+        params = {**SMALL_PARAMS, 'max_features': 500}
+    else:
+        monkeypatch.setattr(ai_analyzer, 'PIPELINE_VERSION', ai_analyzer.PIPELINE_VERSION + 1)
+    ai_analyzer.load_or_train_model(labelled_dataset, params, model_dir)
+    assert len(training_calls) == 2
+    assert len(ai_analyzer.load_registry(os.path.join(model_dir, 'registry.json'))) == 2
+
+
+def test_process_start_includes_earlier_imports():
+    #Importações feitas antes do ai_analyzer (como as do noticias.py no main.py) entram no cold start
+    code = "import time; time.sleep(0.5); import ai_analyzer; print(time.perf_counter() - ai_analyzer.PROCESS_START)"
+    elapsed = float(subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                                   check=True).stdout.split()[-1])
+    assert elapsed >= 0.5
+
+
+def test_cold_start_excludes_scrape_wait(tmp_path, monkeypatch):
+    log_path = tmp_path / 'cold_start.jsonl'
+    monkeypatch.setattr(ai_analyzer, 'PROCESS_START', time.perf_counter() - 5)
+    seconds = ai_analyzer.record_cold_start(str(log_path), scrape_wait_s=3.0, model='abc', source='cache')
+    assert 2 <= seconds < 3
+    entry = json.loads(log_path.read_text(encoding='utf-8'))
+    assert entry['scrape_wait_s'] == 3.0
+    assert entry['model'] == 'abc'
+
+
+def fetched(*titles, host='g1.globo.com'):
+    return [{'title': title, 'link': f'/{host}/{title}', 'source': f'https://{host}/meio-ambiente/'} for title in titles]
+
+
+@pytest.mark.parametrize('deduplicate', [False, True])
+def test_only_new_news_are_classified(project_dir, deduplicate):
+    model = RecordingModel()
+    ai_analyzer.classify_all(model, fetched('Seca no Nordeste', 'Reflorestamento avança no Sul'), deduplicate)
+    model.calls.clear()
+    ai_analyzer.classify_all(model, fetched('Seca atinge o Sul', host='exame.com'), deduplicate)
+    #O histórico já classificado não passa pelo modelo de novo
+    texts = model.calls[0]
+    assert 'seca atinge sul ' in texts
+    assert not any(text.startswith('seca no nordeste') for text in texts)
+    #As porcentagens de results.json contam todo o histórico
+    assert read_json('json/results.json') == {'Boas': '33.33%', 'Ruins': '66.67%'}
+    history = storage.read_frame(storage.PREDICTIONS_STORE, columns=['title', 'prediction'])
+    assert sorted(history['title']) == ['Reflorestamento avança no Sul', 'Seca atinge o Sul', 'Seca no Nordeste']
+
+    #Sem notícias novas, o histórico e as porcentagens não mudam
+    ai_analyzer.classify_all(model, [], deduplicate)
+    assert read_json('json/results.json') == {'Boas': '33.33%', 'Ruins': '66.67%'}
+    #Depois de uma busca completa, o histórico é refeito
+    ai_analyzer.classify_all(model, fetched('Reflorestamento avança no Sul'), deduplicate, replace=True)
+    assert read_json('json/results.json') == {'Boas': '100.00%', 'Ruins': '0.00%'}
+    assert len(storage.read_frame(storage.PREDICTIONS_STORE, columns=['prediction'])) == 1
+
+
+def test_duplicates_across_runs_count_once(project_dir):
+    model = RecordingModel()
+    ai_analyzer.classify_all(model, fetched('Seca no Nordeste', 'Reflorestamento avança no Sul'))
+    ai_analyzer.classify_all(model, fetched('Seca no Nordeste', host='exame.com'))
+    #A mesma manchete em outro site cai no grupo da primeira busca e conta uma vez só nas porcentagens
+    history = storage.read_frame(storage.PREDICTIONS_STORE, columns=['title', 'prediction', 'cluster'])
+    assert len(history) == 3
+    assert history['cluster'].nunique() == 2
+    assert read_json('json/results.json') == {'Boas': '50.00%', 'Ruins': '50.00%'}
+
+
+def test_predict_batch_predicts_shared_headlines_once(tmp_path):
+    shared = {'title': 'Seca atinge o Nordeste', 'introducao': 'Rios secam no sertão'}
+    days = [
+        [shared, {'title': 'Reflorestamento avança no Sul', 'introducao': 'Mudas plantadas'}],
+        [{'title': 'Nova seca no Pantanal', 'introducao': 'Queimadas crescem'}, shared,
+         {'title': 'Reflorestamento avança no Sul', 'introducao': 'Mudas plantadas'}],
+    ]
+    jobs = []
+    for i, records in enumerate(days, start=1):
+        input_path = tmp_path / f'dia{i}.json'
+        input_path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+        jobs.append((str(input_path), str(tmp_path / f'dia{i}result.json'), str(tmp_path / f'dia{i}news.json')))
+    model = RecordingModel()
+    ai_analyzer.predict_batch(model, jobs)
+
+    #Uma única chamada ao modelo, com cada texto distinto dos dois arquivos uma vez
+    assert len(model.calls) == 1
+    assert sorted(model.calls[0]) == sorted(ai_analyzer.clean_text_series(pd.Series(
+        ['Seca atinge o Nordeste Rios secam no sertão', 'Reflorestamento avança no Sul Mudas plantadas',
+         'Nova seca no Pantanal Queimadas crescem'])).tolist())
+    #Cada arquivo recebe as suas porcentagens e as suas notícias, na ordem de entrada
+    assert read_json(tmp_path / 'dia1result.json') == {'Boas': '50.00%', 'Ruins': '50.00%'}
+    assert read_json(tmp_path / 'dia2result.json') == {'Boas': '33.33%', 'Ruins': '66.67%'}
+    assert read_json(tmp_path / 'dia1news.json') == [
+        {'title': 'Seca atinge o Nordeste', 'prediction': 'bad'},
+        {'title': 'Reflorestamento avança no Sul', 'prediction': 'good'},
+    ]
+    assert read_json(tmp_path / 'dia2news.json') == [
+        {'title': 'Nova seca no Pantanal', 'prediction': 'bad'},
+        {'title': 'Seca atinge o Nordeste', 'prediction': 'bad'},
+        {'title': 'Reflorestamento avança no Sul', 'prediction': 'good'},
+    ]
+
+
+#Parâmetros do treino incremental reduzidos para os testes
+STREAMING_TEST_PARAMS = {**ai_analyzer.STREAMING_PARAMS, 'n_features': 2 ** 12, 'chunk_size': 32, 'epochs': 3}
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return str(path)
+
+
+def test_jsonl_is_read_in_chunks(tmp_path, monkeypatch):
+    records = labelled_records(25)
+    path = write_jsonl(tmp_path / 'rotuladas.jsonl', records)
+    #JSON Lines não passa por load_dataset, que carregaria o arquivo inteiro
+    monkeypatch.setattr(ai_analyzer, 'load_dataset', lambda *args: pytest.fail("arquivo carregado inteiro"))
+    chunks = list(ai_analyzer.iter_labelled_chunks(path, chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [title for chunk in chunks for title in chunk['title']] == [record['title'] for record in records]
+
+
+def test_json_list_is_split_in_chunks(labelled_dataset):
+    chunks = list(ai_analyzer.iter_labelled_chunks(labelled_dataset, chunk_size=50))
+    assert [len(chunk) for chunk in chunks] == [50, 50, 20]
+    assert set(chunks[0]['label']) == {0, 1}
+
+
+def test_partial_fit_chunk_encodes_labels_like_load_dataset(tmp_path, monkeypatch):
+    records = labelled_records(6)
+    records[2]['label'] = 'neutra'
+    json_path = tmp_path / 'rotuladas.json'
+    json_path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+    expected = ai_analyzer.load_dataset(str(json_path))['label'].tolist()
+    assert expected == [0, 1, 2, 1, 0, 1]
+
+    received = []
+    model = ai_analyzer.build_streaming_model(STREAMING_TEST_PARAMS)
+    fit = model[-1].partial_fit
+    monkeypatch.setattr(model[-1], 'partial_fit', lambda X, y, classes: received.append(y) or fit(X, y, classes))
+    #Rótulos em texto (JSON Lines) e já convertidos (lista JSON) chegam ao classificador com a mesma codificação
+    chunk = next(ai_analyzer.iter_labelled_chunks(write_jsonl(tmp_path / 'rotuladas.jsonl', records)))
+    ai_analyzer.partial_fit_chunk(model, chunk, random_state=0)
+    ai_analyzer.partial_fit_chunk(model, next(ai_analyzer.iter_labelled_chunks(str(json_path))), random_state=0)
+    #O bloco é embaralhado, mas cada rótulo mantém o índice da sua notícia
+    assert [labels.sort_index().tolist() for labels in received] == [expected, expected]
+
+
+def test_train_streaming_runs_every_chunk_of_every_epoch(labelled_dataset, monkeypatch):
+    calls = []
+    partial_fit_chunk = ai_analyzer.partial_fit_chunk
+    monkeypatch.setattr(ai_analyzer, 'partial_fit_chunk',
+                        lambda model, chunk, random_state=None: calls.append(len(chunk)) or
+                        partial_fit_chunk(model, chunk, random_state))
+    model = ai_analyzer.train_streaming(labelled_dataset, params=STREAMING_TEST_PARAMS)
+    assert calls == [32, 32, 32, 24] * 3
+    df = ai_analyzer.load_dataset(labelled_dataset)
+    predictions = model.predict(ai_analyzer.clean_text_series(df['title'] + " " + df['introducao']))
+    assert (predictions == df['label'].to_numpy()).mean() > 0.9
+
+
+def test_update_streaming_model_continues_from_saved_weights(labelled_dataset, tmp_path):
+    model_path = str(tmp_path / 'models' / 'streaming.joblib')
+    first = ai_analyzer.update_streaming_model(labelled_dataset, model_path, STREAMING_TEST_PARAMS)
+    saved = ai_analyzer.joblib.load(model_path)
+    coef, steps = saved[-1].coef_.copy(), saved[-1].t_
+    np.testing.assert_array_equal(coef, first[-1].coef_)
+
+    daily_path = write_jsonl(tmp_path / 'rotuladas_do_dia.jsonl', labelled_records(40, seed=2))
+    ai_analyzer.update_streaming_model(daily_path, model_path, STREAMING_TEST_PARAMS)
+    updated = ai_analyzer.joblib.load(model_path)[-1]
+    assert not np.array_equal(updated.coef_, coef)
+    #O SGD continua contando os passos do modelo salvo, em vez de recomeçar
+    assert updated.t_ == steps + 40
+    #Os pesos são os do modelo salvo atualizado com as notícias do dia, não os de um treino do zero
+    continued = ai_analyzer.train_streaming(daily_path, saved, STREAMING_TEST_PARAMS, epochs=1)[-1]
+    scratch = ai_analyzer.train_streaming(daily_path, None, STREAMING_TEST_PARAMS, epochs=1)[-1]
+    np.testing.assert_allclose(updated.coef_, continued.coef_)
+    assert not np.allclose(updated.coef_, scratch.coef_)
+
+
+def test_compare_with_streaming(labelled_dataset, capsys):
+    batch_accuracy, streaming_accuracy = ai_analyzer.compare_with_streaming(labelled_dataset, SMALL_PARAMS,
+                                                                            STREAMING_TEST_PARAMS)
+    assert batch_accuracy > 0.9
+    assert streaming_accuracy > 0.9
+    output = capsys.readouterr().out
+    assert f"{batch_accuracy:.4f}" in output and f"{streaming_accuracy:.4f}" in output
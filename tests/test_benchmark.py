@@ -0,0 +1,44 @@
+import argparse
+import json
+import os
+import pytest
+import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def result(throughput, peak_bytes):
+    return {'throughput': throughput, 'peak_bytes': peak_bytes}
+
+
+def test_small_memory_increase_is_not_a_regression():
+    baseline = {'scrape': result(100, 0), 'clean': result(100, 8 * 1024)}
+    results = {'scrape': result(100, 12 * 1024), 'clean': result(100, 512 * 1024)}
+    assert benchmark.find_regressions(results, baseline, 0.25, 0.10) == []
+
+
+def test_memory_and_throughput_regressions():
+    baseline = {'predict': result(100, 100 << 20), 'render': result(100, 1 << 20)}
+    results = {'predict': result(70, 105 << 20), 'render': result(100, 3 << 20)}
+    regressions = benchmark.find_regressions(results, baseline, 0.25, 0.10)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('predict: vazão')
+    assert regressions[1].startswith('render: pico')
+
+
+def regress_args(baseline, size):
+    return argparse.Namespace(baseline=str(baseline), save_baseline=False, threshold=0.25, memory_threshold=0.10,
+                              memory_floor=benchmark.MEMORY_FLOOR, only=None, size=size, repeat=3,
+                              fixtures=os.path.join(ROOT, benchmark.FIXTURES_DIR))
+
+
+@pytest.mark.parametrize('saved', [{'scrape': result(100, 0)}, None])
+def test_refuses_baseline_measured_with_other_parameters(tmp_path, monkeypatch, saved):
+    monkeypatch.setattr(benchmark, 'run_suite', lambda args: pytest.fail("a suíte não deveria rodar"))
+    path = tmp_path / 'baseline.json'
+    if saved is None:  #Linha de base no formato atual, mas com outro --size
+        saved = {'params': benchmark.suite_params(regress_args(path, 2000)), 'results': {}}
+    path.write_text(json.dumps(saved), encoding='utf-8')
+    with pytest.raises(SystemExit) as error:
+        benchmark.bench_regress(regress_args(path, 20000))
+    assert 'foi medida com' in str(error.value)
@@ -0,0 +1,104 @@
+import json
+import pytest
+import noticias
+from crawl_state import CrawlState
+from noticias import fetch_news
+from stand_in import g1_page
+
+
+@pytest.fixture
+def state(tmp_path):
+    with CrawlState(str(tmp_path / 'crawl_state.db')) as crawl_state:
+        yield crawl_state
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    original = noticias.parse_news_items
+
+    def counting_parse(html, *args, **kwargs):
+        calls.append(html)
+        return original(html, *args, **kwargs)
+    monkeypatch.setattr(noticias, 'parse_news_items', counting_parse)
+    return calls
+
+
+def fetch_site(site, state):
+    return fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name'], state=state)
+
+
+def test_not_modified_page_is_not_parsed(stand_in, state, parse_calls):
+    stand_in.server.etags = True
+    site = stand_in.websites(noticias.websites)[0]
+    assert fetch_site(site, state)
+    assert fetch_site(site, state) == []
+    assert stand_in.server.not_modified == [site['url'][len(stand_in.base):]]
+    assert len(parse_calls) == 1
+
+
+def test_only_new_items_are_returned(stand_in, state):
+    site = stand_in.websites(noticias.websites)[0]
+    first = fetch_site(site, state)
+    path = site['url'][len(stand_in.base):]
+    stand_in.server.pages[path] = g1_page().replace('<div class="feed">', '<div class="feed"><h2><a class="feed-post-link" '
+                                                     'href="/g1/novo">Nova frente fria chega ao Sul</a></h2>')
+    second = fetch_site(site, state)
+    assert [item['title'] for item in second] == ['Nova frente fria chega ao Sul']
+    assert all(item['title'] != 'Nova frente fria chega ao Sul' for item in first)
+
+
+def test_pagination_stops_at_page_with_only_known_items(stand_in, state, parse_calls):
+    site = stand_in.websites(noticias.websites)[1]
+    fetch_site(site, state)
+    pages_first_run = len(parse_calls)
+    path = site['url'][len(stand_in.base):] + '?page=1'
+    stand_in.server.pages[path] = ('<html><body><div class="item_list container"><h4><a href="/ab/novo">Temporal novo</a></h4>'
+                                   '<a href="/tags/meio-ambiente?page=2">Próxima</a></div></body></html>')
+    parse_calls.clear()
+    news_data = fetch_site(site, state)
+    assert [item['title'] for item in news_data] == ['Temporal novo']
+    assert pages_first_run > 2
+    assert len(parse_calls) == 2  #Página 1 (nova) e página 2 (só notícias conhecidas)
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch, stand_in):
+    #noticias.main usa os caminhos padrão em json/, relativos ao diretório atual
+    (tmp_path / 'json').mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(noticias, 'websites', stand_in.websites(noticias.websites))
+    return tmp_path
+
+
+def test_full_run_keeps_state_for_incremental_runs(stand_in, project_dir):
+    stand_in.server.etags = True
+    first = noticias.main()
+    #Notícia publicada depois da primeira busca: só a busca completa a encontra
+    site = noticias.websites[0]
+    stand_in.server.pages[site['url'][len(stand_in.base):]] = g1_page().replace(
+        '<div class="feed">', '<div class="feed"><h2><a class="feed-post-link" href="/g1/novo">Nova frente fria chega ao Sul</a></h2>')
+    full = noticias.main(full=True)
+    assert len(full) == len(first) + 1
+
+    #A busca completa registrou as notícias e os validadores: a próxima incremental não acrescenta nada
+    stand_in.server.not_modified.clear()
+    assert noticias.main() == []
+    assert stand_in.server.not_modified
+    assert [item['title'] for item in noticias.load_saved_news()] == [item['title'] for item in full]
+
+
+def test_store_is_the_record_and_json_is_exported(stand_in, project_dir):
+    legacy = [{'title': 'Seca antiga no Nordeste', 'link': '/antiga', 'source': 'https://g1.globo.com/meio-ambiente/'}]
+    (project_dir / 'json' / 'news_data.json').write_text(json.dumps(legacy), encoding='utf-8')
+    new_items = noticias.main()
+    #O JSON antigo é importado uma vez; depois disso as buscas só gravam no armazenamento
+    news_data = noticias.load_saved_news()
+    assert legacy[0] in news_data
+    assert all(item['title'] in [saved['title'] for saved in news_data] for item in new_items)
+    assert len(news_data) == len(new_items) + 1
+    assert json.loads((project_dir / 'json' / 'news_data.json').read_text(encoding='utf-8')) == legacy
+    exported = project_dir / 'exported.json'
+    noticias.main(export=str(exported))
+    assert [item['title'] for item in json.loads(exported.read_text(encoding='utf-8'))] == \
+        [item['title'] for item in news_data]
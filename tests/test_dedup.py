@@ -0,0 +1,43 @@
+import json
+import os
+import pytest
+from dedup import DedupIndex, article_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAY_FILES = [os.path.join(ROOT, 'json', f'dia{i}.json') for i in range(1, 6)]
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def index(tmp_path):
+    with DedupIndex(str(tmp_path / 'dedup.db')) as dedup_index:
+        yield dedup_index
+
+
+#Nos arquivos diários o link é o endereço da seção, repetido em várias notícias do mesmo site
+@pytest.mark.parametrize('path', DAY_FILES)
+def test_distinct_headlines_stay_in_distinct_clusters(index, path):
+    records = load(path)
+    assert len({record.get('link') for record in records}) < len(records)
+    clusters = index.assign(records, [record['title'] for record in records])
+    assert len(set(clusters)) == len({article_text(record) for record in records})
+
+
+def test_all_days_share_one_index(index):
+    records = [record for path in DAY_FILES for record in load(path)]
+    clusters = [cluster for path in DAY_FILES for cluster in index.assign(load(path), [record['title'] for record in load(path)])]
+    texts = [article_text(record) for record in records]
+    #Manchetes iguais em dias diferentes caem no mesmo grupo; manchetes diferentes, em grupos diferentes
+    assert len(set(clusters)) == len(set(texts))
+    assert all((first == second) == (clusters[i] == clusters[j])
+               for i, first in enumerate(texts) for j, second in enumerate(texts))
+
+
+def test_known_article_keeps_its_cluster(index):
+    records = load(DAY_FILES[0])
+    first = index.assign(records, [record['title'] for record in records])
+    assert index.assign(records[::-1], [record['title'] for record in records[::-1]]) == first[::-1]
@@ -0,0 +1,32 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+
+
+def busy_worker_function():
+    return sum(i * i for i in range(20000))
+
+
+def test_profiles_functions_run_in_worker_threads():
+    instrumentation.start_profiling(memory=False)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pool.submit(busy_worker_function).result()
+    report = instrumentation.stop_profiling(top=50)
+    assert 'busy_worker_function' in report['cpu_profile']
+    #Até o Python 3.11 cada thread tem o seu profiler; a partir do 3.12 um único profiler cobre todas
+    assert report['profiled_threads'] >= (2 if instrumentation.PROFILER_PER_THREAD else 1)
+
+
+def test_export_json_with_stages_and_counters(tmp_path):
+    instrumentation.reset()
+    with instrumentation.stage('busca'):
+        instrumentation.count('paginas_buscadas', 3)
+    with instrumentation.stage('busca'):
+        instrumentation.count('paginas_buscadas')
+    path = tmp_path / 'metrics' / 'run.json'
+    instrumentation.export_json(str(path), {'memory': {'peak_bytes': 1}})
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['counters'] == {'paginas_buscadas': 4}
+    assert data['stages']['busca']['calls'] == 2
+    assert data['profile'] == {'memory': {'peak_bytes': 1}}
+    instrumentation.reset()
@@ -0,0 +1,47 @@
+import glob
+import json
+import os
+import pytest
+from keyword_filter import KEYWORDS, KeywordMatcher, get_keyword_matcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_match(title):
+    return any(keyword in title.lower() for keyword in KEYWORDS)
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('Enchentes no RS', ['enchente']),
+    ('Alertas de temporais para o Sul', ['alerta', 'temporais']),
+    ('Alagamentos e impactos na cidade', ['alagamento', 'impacto']),
+    ('POLUICAO do ar em SP', ['poluição']),
+    ('Mudanças   climáticas e secas', ['mudanças climáticas', 'secas']),
+    ('Crise climática', ['clima']),
+])
+def test_matches_inflected_and_unaccented_forms(title, expected):
+    assert get_keyword_matcher().match(title) == expected
+
+
+@pytest.mark.parametrize('title', ['Nova biblioteca municipal', 'Ressecamento da pele no inverno', 'Futebol: final'])
+def test_ignores_keywords_inside_words(title):
+    assert get_keyword_matcher().match(title) == []
+
+
+def test_per_site_keywords():
+    matcher = KeywordMatcher(('energia solar',))
+    assert matcher.match('Energia Solar cresce') == ['energia solar']
+    assert matcher.match('Enchentes no RS') == []
+
+
+def test_accepts_every_title_the_original_filter_accepted():
+    matcher = get_keyword_matcher()
+    titles = []
+    for path in glob.glob(os.path.join(ROOT, 'json', '*.json')):
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data, list):
+            titles.extend(item['title'] for item in data if isinstance(item, dict) and 'title' in item)
+    accepted = [title for title in titles if legacy_match(title)]
+    assert accepted
+    assert [title for title in accepted if not matcher.match(title)] == []
@@ -0,0 +1,43 @@
+import json
+import pytest
+import model_search
+from model_search import fastest_within_budget, save_report, search
+
+
+def entry(cv, holdout, latency):
+    return {'cv_accuracy': cv, 'holdout_accuracy': holdout, 'predict_latency_ms_per_doc': latency}
+
+
+def test_fastest_within_budget_checks_holdout_accuracy():
+    degenerate = entry(0.79, 0.047, 0.01)
+    report = [entry(0.80, 0.95, 0.05), entry(0.795, 0.94, 0.03), degenerate]
+    assert fastest_within_budget(report, 0.02) == report[1]
+
+
+def test_best_cv_and_best_holdout_from_different_configurations():
+    #Caso de "--random 4 --folds 3": nenhuma configuração fica dentro da margem das duas melhores
+    report = [entry(0.9764, 0.9528, 0.05), entry(0.9646, 0.9717, 0.01), entry(0.90, 0.90, 0.001)]
+    assert fastest_within_budget(report, 0.01) == report[0]
+
+
+#As configurações inválidas geram avisos do sklearn durante a busca
+@pytest.mark.filterwarnings('ignore')
+def test_search_and_save_report(labelled_dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_search, 'PARAM_GRID', {'max_features': [50, 200], 'ngram_range': [(1, 1)],
+                                                     'n_components': [5, 500]})
+    report = search(labelled_dataset, folds=2, n_jobs=1)
+    #n_components=500 é maior que o vocabulário e é descartado
+    assert len(report) == 4
+    assert all(candidate['params']['n_components'] == 5 for candidate in report)
+    for candidate in report:
+        assert set(candidate) == {'params', 'cv_accuracy', 'cv_accuracy_std', 'fit_time_s', 'holdout_accuracy',
+                                  'predict_latency_ms_per_doc', 'model_size_bytes'}
+        assert 0 <= candidate['holdout_accuracy'] <= 1
+        assert candidate['fit_time_s'] > 0
+
+    path = tmp_path / 'models' / 'model_search.json'
+    payload = save_report(report, 0.01, str(path))
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['fastest_within_budget'] == json.loads(json.dumps(payload['fastest_within_budget']))
+    assert len(saved['candidates']) == 4
+    assert [file.name for file in path.parent.iterdir()] == ['model_search.json']
@@ -0,0 +1,121 @@
+import os
+import time
+import pytest
+import requests
+from bs4 import BeautifulSoup
+import noticias
+from noticias import ConcurrentFetcher, fetch_all_news, fetch_news
+from stand_in import AGENCIA_PAGES, agencia_titles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#Palavras-chave da versão original de fetch_news
+LEGACY_KEYWORDS = [
+    'meio ambiente', 'sustentabilidade', 'ecologia', 'natureza', 'poluição', 'enchente', 'chuvas',
+    'alagamento', 'queimadas', 'queimada', 'animais', 'desmatamento', 'clima',
+    'mudanças climáticas', 'fauna', 'flora', 'reflorestamento', 'reciclagem',
+    'biodiversidade', 'aquecimento global', 'impacto', 'ambiental', 'temperatura',
+    'temperaturas', 'frente fria', 'inundações', 'temporais', 'temporal', 'catástrofe',
+    'catástrofes', 'alerta', 'seca', 'secas', 'ecossistema', 'ecossistemas',
+    'risco', 'riscos', 'cheia', 'cheias'
+]
+
+
+#Busca sequencial da versão original: uma requisição por vez, sem sessão, html.parser
+def legacy_fetch_news(url, headline_tag, link_tag, max_pages=10):
+    news_data = []
+    seen_titles = set()
+    pages = [f"{url}?page={page}" for page in range(1, max_pages + 1)] if 'agenciabrasil.ebc.com.br' in url else [url]
+    for page, page_url in enumerate(pages, start=1):
+        soup = BeautifulSoup(requests.get(page_url).text, 'html.parser')
+        for item in [a for tag in soup.find_all(headline_tag) for a in tag.find_all(link_tag, href=True)]:
+            title = item.get_text(strip=True)
+            if title not in seen_titles:
+                seen_titles.add(title)
+                if any(keyword in title.lower() for keyword in LEGACY_KEYWORDS):
+                    news_data.append({'title': title, 'link': item['href'], 'source': page_url})
+        if len(pages) > 1:
+            next_page = soup.find('div', class_='item_list container').find('a', {'href': f'/tags/meio-ambiente?page={page+1}'})
+            if not next_page:
+                break
+    return news_data
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(noticias, 'BACKOFF_FACTOR', 0.01)
+
+
+def without_keywords(news_data):
+    return [{key: value for key, value in item.items() if key != 'keywords'} for item in news_data]
+
+
+def test_fetch_all_news_matches_sequential_version(stand_in):
+    sites = stand_in.websites(noticias.websites)
+    expected = [item for site in sites for item in legacy_fetch_news(site['url'], site['headline_tag'], site['link_tag'])]
+    assert len(expected) > len(sites)  #Todos os layouts contribuem com notícias
+    assert without_keywords(fetch_all_news(sites)) == expected
+
+
+def test_every_layout_is_parsed(stand_in):
+    for site in stand_in.websites(noticias.websites):
+        assert fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name']), site['url']
+
+
+def test_agencia_pagination_keeps_page_order(stand_in):
+    site = stand_in.websites(noticias.websites)[1]
+    stand_in.server.delay = 0.05
+    news_data = fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name'])
+    expected = [title for page in range(1, AGENCIA_PAGES + 1) for title in agencia_titles(page) if 'Temporal' in title]
+    assert [item['title'] for item in news_data] == expected
+    assert news_data[0]['source'].endswith('?page=1')
+    #As páginas seguintes são pedidas antes de a atual ser processada
+    assert stand_in.server.max_active > 1
+
+
+def test_per_host_limit(stand_in):
+    stand_in.server.delay = 0.1
+    url = stand_in.websites(noticias.websites)[0]['url']
+    with ConcurrentFetcher(max_workers=8, max_per_host=2) as fetcher:
+        responses = [future.result() for future in [fetcher.submit(url) for _ in range(8)]]
+    assert all(response.status_code == 200 for response in responses)
+    assert stand_in.server.max_active == 2
+
+
+def test_retries_temporary_failures(stand_in, fast_retries):
+    site = stand_in.websites(noticias.websites)[0]
+    path = site['url'][len(stand_in.base):]
+    stand_in.server.failures[path] = 2
+    news_data = fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name'])
+    assert news_data
+    assert stand_in.server.requests.count(path) == 3
+
+
+def test_gives_up_after_max_retries(stand_in, fast_retries):
+    site = stand_in.websites(noticias.websites)[0]
+    path = site['url'][len(stand_in.base):]
+    stand_in.server.failures[path] = 100
+    assert fetch_news(site['url'], site['headline_tag'], site['link_tag'], site['class_name']) == []
+    assert stand_in.server.requests.count(path) == noticias.MAX_RETRIES + 1
+
+
+def test_read_timeout(stand_in, fast_retries):
+    stand_in.server.delay = 1
+    url = stand_in.websites(noticias.websites)[0]['url']
+    start = time.perf_counter()
+    with ConcurrentFetcher(timeout=(1, 0.1)) as fetcher:
+        with pytest.raises(requests.RequestException):
+            fetcher.get(url)
+    assert time.perf_counter() - start < 1
+
+
+def test_saved_fixtures_use_class_name_only_as_a_hint():
+    import benchmark
+    fixtures = benchmark.load_fixtures(noticias.websites, os.path.join(ROOT, benchmark.FIXTURES_DIR))
+    for name, (site, html) in fixtures.items():
+        entries = noticias.parse_news_items(html, site['headline_tag'], site['link_tag'], site['class_name'])
+        assert len(entries) >= 20, name
+        assert len(set(entries)) == len(entries)
+    #Só o g1 marca os links com a classe configurada; nos outros sites vale o fallback para todos os links
+    assert 'feed-post-link' in fixtures['g1.globo.com.html'][1]
+    assert 'feed-post-link' not in fixtures['www.bbc.com.html'][1]
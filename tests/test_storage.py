@@ -0,0 +1,85 @@
+import json
+import os
+import pandas as pd
+import pytest
+import storage
+
+FORMATS = ['parquet', 'jsonl']
+
+
+def news(count, start=0, host='g1.globo.com'):
+    return [{'title': f'Notícia {i} — "aspas"', 'link': f'/n/{i}', 'source': f'https://{host}/meio-ambiente/',
+             'keywords': ['seca', 'clima']} for i in range(start, start + count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return str(tmp_path / 'news_store')
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_append_and_read_in_order(store, fmt):
+    storage.append_records(news(2), store, fmt, day='2024-05-01')
+    storage.append_records(news(3, 2), store, fmt, day='2024-05-01')
+    frame = storage.read_frame(store)
+    assert frame['title'].tolist() == [item['title'] for item in news(5)]
+    assert set(frame['day']) == {'2024-05-01'}
+    assert set(frame['host']) == {'g1.globo.com'}
+    assert [list(keywords) for keywords in frame['keywords']] == [['seca', 'clima']] * 5
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_read_selected_columns_and_partitions(store, fmt):
+    storage.append_records(news(2), store, fmt, day='2024-05-01')
+    storage.append_records(news(2, 10, host='exame.com'), store, fmt, day='2024-05-02')
+    frame = storage.read_frame(store, columns=['title', 'link'], days=['2024-05-02'])
+    assert list(frame.columns) == ['title', 'link']
+    assert frame['link'].tolist() == ['/n/10', '/n/11']
+    assert storage.read_frame(store, columns=['title'], hosts=['g1.globo.com'])['title'].tolist() == \
+        [item['title'] for item in news(2)]
+
+
+def test_records_with_different_columns(store):
+    storage.append_records(news(1), store, 'parquet', day='2024-05-01')
+    storage.append_records([{'title': 'Sem palavras-chave', 'link': '/x', 'source': 'https://g1.globo.com/'}],
+                           store, 'parquet', day='2024-05-01')
+    frame = storage.read_frame(store)
+    assert frame['title'].tolist() == [news(1)[0]['title'], 'Sem palavras-chave']
+    assert frame['keywords'].isna().tolist() == [False, True]
+
+
+def test_compact_keeps_order_and_types(store):
+    for start in range(0, 6, 2):
+        storage.append_records(news(2, start), store, 'parquet', day='2024-05-01')
+    assert storage.compact(store) == 1
+    assert len(storage.partition_files(store, 'parquet')) == 1
+    #Acréscimos depois da compactação são lidos junto com o arquivo compactado
+    storage.append_records(news(1, 6), store, 'parquet', day='2024-05-01')
+    frame = storage.read_frame(store)
+    assert frame['title'].tolist() == [item['title'] for item in news(7)]
+    schemas = [storage.pq.read_schema(path) for path, _, _ in storage.partition_files(store, 'parquet')]
+    assert schemas[0].field('title').type == schemas[1].field('title').type
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_export_import_round_trip(store, tmp_path, fmt):
+    records = news(3) + news(2, 3, host='exame.com')
+    source = tmp_path / 'news_data.json'
+    source.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+    assert storage.import_json(str(source), store, fmt, day='2024-05-01') == 5
+    exported = tmp_path / 'exported.json'
+    assert storage.export_json(store, str(exported)) == 5
+    #As partições ficam em ordem de host: exame.com antes de g1.globo.com
+    assert json.loads(exported.read_text(encoding='utf-8')) == records[3:] + records[:3]
+
+
+def test_write_frame_formats(tmp_path):
+    frame = pd.DataFrame({'title': ['a', 'b'], 'prediction': ['good', 'bad']})
+    for name in ('news.parquet', 'news.jsonl', 'news.json'):
+        path = str(tmp_path / name)
+        storage.write_frame(frame, path)
+        if name.endswith('.json'):
+            assert json.loads(open(path, encoding='utf-8').read()) == frame.to_dict('records')
+        else:
+            assert storage.read_frame(path).to_dict('records') == frame.to_dict('records')
+            assert storage.read_frame(path, columns=['prediction'])['prediction'].tolist() == ['good', 'bad']